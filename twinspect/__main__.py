@@ -37,7 +37,11 @@ def no_command(
 
 
 @app.command()
-def run():
+def run(
+    force: bool = Option(
+        False, "--force", help="Reprocess media files and recompute metrics ignoring caches"
+    )
+):
     """Compute all configured benchmarks."""
     title = f"\n\nTwinSpect v{ts.__version__}"
     typer.echo(title)
@@ -50,7 +54,12 @@ def run():
         )
         benchmark.algorithm.install()
         benchmark.dataset.install()
-        benchmark.simprint()  # process media files and create simprint file
+        simprint_path = benchmark.simprint(force=force)  # process media files and create simprint
+        if force:
+            # Drop cached metrics and ANNS index so that all metrics are recomputed from the new
+            # simprint file
+            benchmark.filepath("json", tag="metrics").unlink(missing_ok=True)
+            simprint_path.with_suffix(".anns").unlink(missing_ok=True)
         for metric in benchmark.metrics:
             func = ts.load_function(metric.function)
             func(benchmark.simprint())
@@ -4,6 +4,20 @@ import iscc_core as ic
 import iscc_sdk as idk
 from loguru import logger as log
 from pathlib import Path
+from PIL import Image
+
+
+def _image_pixels(fp):
+    # type: (str|Path) -> list[int]
+    """Decode image once and return normalized 32x32 grayscale pixels for Image-Code hashing."""
+    with Image.open(fp) as im:
+        return list(idk.image_normalize(im))
+
+
+def _audio_features(fp):
+    # type: (str|Path) -> list[int]
+    """Decode audio once and return chromaprint features for Audio-Code hashing."""
+    return idk.audio_features_extract(fp)["fingerprint"]
 
 
 def text_code_v0_64(fp) -> Optional[str]:
@@ -11,7 +25,7 @@ def text_code_v0_64(fp) -> Optional[str]:
     ic.core_opts.text_bits = 64
     try:
         iscc_meta = idk.code_text(fp)
-        log.success(f"{iscc_meta.iscc} <- {Path(fp).name}")
+        log.opt(lazy=True).success("{} <- {}", lambda: iscc_meta.iscc, lambda: Path(fp).name)
     except Exception as e:
         log.error(f"Failed hashing {fp} - {e}")
         return None
@@ -19,27 +33,23 @@ def text_code_v0_64(fp) -> Optional[str]:
 
 
 def image_code_v0_64(fp) -> Optional[str]:
-    idk.sdk_opts.extract_metadata = False
-    ic.core_opts.image_bits = 64
     try:
-        iscc_meta = idk.code_image(fp)
-        log.success(f"{iscc_meta.iscc} <- {Path(fp).name}")
+        iscc = ic.gen_image_code_v0(_image_pixels(fp), bits=64)["iscc"]
+        log.opt(lazy=True).success("{} <- {}", lambda: iscc, lambda: Path(fp).name)
     except Exception as e:
         log.error(f"Failed hashing {fp} - {e}")
         return None
-    return iscc_meta.iscc_obj.hash_bytes.hex()
+    return ic.Code(iscc).hash_bytes.hex()
 
 
 def audio_code_v0_64(fp) -> Optional[str]:
-    idk.sdk_opts.extract_metadata = False
-    ic.core_opts.audio_bits = 64
     try:
-        iscc_meta = idk.code_audio(fp)
-        log.success(f"{iscc_meta.iscc} <- {Path(fp).name}")
+        iscc = ic.gen_audio_code_v0(_audio_features(fp), bits=64)["iscc"]
+        log.opt(lazy=True).success("{} <- {}", lambda: iscc, lambda: Path(fp).name)
     except Exception as e:
         log.error(f"Failed hashing {fp} - {e}")
         return None
-    return iscc_meta.iscc_obj.hash_bytes.hex()
+    return ic.Code(iscc).hash_bytes.hex()
 
 
 def video_code_v0_64(fp) -> Optional[str]:
@@ -47,7 +57,7 @@ def video_code_v0_64(fp) -> Optional[str]:
     ic.core_opts.video_bits = 64
     try:
         iscc_meta = idk.code_video(fp)
-        log.success(f"{iscc_meta.iscc} <- {Path(fp).name}")
+        log.opt(lazy=True).success("{} <- {}", lambda: iscc_meta.iscc, lambda: Path(fp).name)
     except Exception as e:
         log.error(f"Failed hashing {fp} - {e}")
         return None
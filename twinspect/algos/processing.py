@@ -1,12 +1,17 @@
 """Calculate ground truth data"""
 import csv
+import threading
 import time
+from collections import namedtuple
 from pathlib import Path
 from typing import Callable
 from loguru import logger as log
-from concurrent.futures import as_completed, ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
 import os
-from rich.progress import track
+import sys
+from importlib.metadata import PackageNotFoundError, version
+from blake3 import blake3
+from rich.progress import Progress
 from codetiming import Timer
 import twinspect as ts
 
@@ -18,78 +23,215 @@ __all__ = [
 ]
 
 
-def simprint(benchmark):
-    # type: (ts.Benchmark) -> Path
+# Lightweight stand-in for `ts.Task` on the per-file hot path (same fields and order)
+TaskFast = namedtuple("TaskFast", "id code file size time")
+
+_worker_function = None  # type: Callable|None
+PROGRESS_BATCH = 64  # Number of items between progress bar updates
+PREFETCH_FACTOR = 2  # Number of files per core to prefetch ahead of processing
+PREFETCH_BYTES = 128 * 1024  # Number of leading bytes per file to prefetch
+
+
+def simprint(benchmark, force=False):
+    # type: (ts.Benchmark, bool) -> Path
     """
     Get file path to processed data for Dataset/Algorithm pair.
 
     Will either return a cached file path or generate a new one and return it.
+
+    :param benchmark: The benchmark to compute the simprint file for.
+    :param force: Ignore cached simprint files and per-file results and reprocess all files.
     """
     file_path = benchmark.filepath("csv", tag="simprint")
-    if file_path.exists():
+    if file_path.exists() and not force:
         log.debug(f"Using cached {file_path.name}")
         return file_path
     with Timer("Data-Folder Processing", text="{name}: {seconds:.2f} seconds", logger=log.info):
-        path = process_data_folder(benchmark.algorithm.function, benchmark.dataset.data_folder)
+        path = process_data_folder(
+            benchmark.algorithm.function,
+            benchmark.dataset.data_folder,
+            force=force,
+            dependencies=benchmark.algorithm.dependencies,
+        )
     return path
 
 
 def process_file(function, task):
-    # type: (Callable, ts.Task) -> ts.Task
+    # type: (Callable, TaskFast) -> TaskFast
     """
     Process compact code for a single media file.
 
     TODO: Collect essential metadata like duration, pixels, characters
     """
     start_time = time.perf_counter()
-    task.code = function(task.file)
-    task.time = round((time.perf_counter() - start_time) * 1000)
-    return task
+    code = function(task.file)
+    elapsed = round((time.perf_counter() - start_time) * 1000)
+    return task._replace(code=code, time=elapsed)
+
+
+def _init_worker(func_path):
+    # type: (str) -> None
+    """Resolve the algorithm function once per worker process and only keep error logs."""
+    global _worker_function
+    log.remove()
+    log.add(sys.stderr, level="ERROR")
+    _worker_function = ts.load_function(func_path)
+
+
+def _process_task(task):
+    # type: (TaskFast) -> TaskFast
+    """Process a single task with the function resolved by `_init_worker`."""
+    return process_file(_worker_function, task)
 
 
-def process_data_folder(func_path, data_folder):
-    # type: (str, Path) -> Path
-    """Process all files in `data_folder` with `function` and function `params`."""
+def prefetch_files(file_paths, window):
+    # type: (list[str], threading.Semaphore) -> None
+    """
+    Warm the OS page cache with the leading `PREFETCH_BYTES` of upcoming media files.
+
+    Each file consumes one slot of the `window` semaphore, which the consumer releases per
+    processed file, so prefetching stays a bounded number of files ahead of processing.
+    """
+    for file_path in file_paths:
+        window.acquire()
+        try:
+            if hasattr(os, "posix_fadvise"):
+                fd = os.open(file_path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            else:
+                with open(file_path, "rb") as infile:
+                    infile.read(PREFETCH_BYTES)
+        except OSError:
+            continue
+
+
+def file_cache_path(func_path, data_folder, dependencies=None):
+    # type: (str, Path, list[str]|None) -> Path
+    """
+    Construct path to the per-file result cache for an algorithm/data_folder pair.
+
+    Unlike simprint files, the cache path does not depend on the data folder checksum so that
+    results for unchanged files survive changes to the dataset. Instead, it includes a key of the
+    algorithm implementation (see `file_cache_key`).
+    """
+    algo_label = func_path.split(":")[-1]
+    key = file_cache_key(func_path, dependencies)
+    return ts.opts.root_folder / f"{algo_label}-{Path(data_folder).name}-{key}-filecache.csv"
+
+
+def file_cache_key(func_path, dependencies=None):
+    # type: (str, list[str]|None) -> str
+    """
+    Compute a 64-bit key of an algorithm implementation for invalidating per-file results.
+
+    The key covers the function path, the source of the module implementing the function and the
+    installed versions of the algorithm dependencies.
+
+    :param func_path: Full path to the algorithm function (module:function).
+    :param dependencies: Algorithm package dependencies as `package==version` strings.
+    :return: Hex encoded key.
+    """
+    hasher = blake3(func_path.encode("utf-8"))
+    module = sys.modules[ts.load_function(func_path).__module__]
+    module_file = getattr(module, "__file__", None)
+    if module_file:
+        hasher.update(Path(module_file).read_bytes())
+    for dep in dependencies or []:
+        package_name = dep.split("==")[0]
+        try:
+            installed_version = version(package_name)
+        except PackageNotFoundError:
+            installed_version = None
+        hasher.update(f";{package_name}=={installed_version}".encode("utf-8"))
+    return hasher.hexdigest(8)
+
+
+def load_file_cache(cache_path):
+    # type: (Path) -> dict[str, tuple[int, int, str, int]]
+    """Load per-file results as mapping of relpath -> (mtime_ns, size, code, time)."""
+    if not cache_path.exists():
+        return {}
+    with open(cache_path, "rt", encoding="utf-8", newline="") as infile:
+        reader = csv.reader(infile, delimiter=";")
+        next(reader)
+        return {row[0]: (int(row[1]), int(row[2]), row[3], int(row[4])) for row in reader}
+
+
+def process_data_folder(func_path, data_folder, force=False, dependencies=None):
+    # type: (str, Path, bool, list[str]|None) -> Path
+    """
+    Process all files in `data_folder` with `function` and function `params`.
+
+    Results of files that are unchanged (same relpath, mtime and size) since a previous run with
+    the same algorithm implementation and dependency versions are taken from the per-file result
+    cache unless `force` is True.
+    """
     data_folder = Path(data_folder)
     result_path = ts.result_path(func_path, data_folder, extension="csv", tag="simprint")
+    cache_path = file_cache_path(func_path, data_folder, dependencies)
+    file_cache = {} if force else load_file_cache(cache_path)
     func = ts.load_function(func_path)
     cores = os.cpu_count()
     total = ts.count_files(data_folder)
     log.debug(f"Processing {data_folder.name} with {cores} max workers")
+    tasks = []
     results = []
-    with ThreadPoolExecutor() as executor:
-        futures = []
-        for idx, file_path in track(
-            enumerate(ts.iter_files(data_folder)),
-            total=total,
-            description="Populating Tasks",
-            console=ts.console,
-        ):
-            file_size = file_path.stat().st_size
-            task = ts.Task(id=idx, file=file_path.as_posix(), size=file_size)
-            futures.append(executor.submit(process_file, func, task))
-
-        for future in track(
-            as_completed(futures),
-            description="Processing Files",
-            console=ts.console,
-            total=total,
-        ):
-            result = future.result()
-            # Fix relative path
-            result.file = Path(result.file).relative_to(data_folder).as_posix()
-            if result.code is None:
-                log.error(f"Failed {func.__name__} on {result.file}")
-                continue
-            results.append(result)
+    mtimes = {}
+    with Progress(console=ts.console, refresh_per_second=4) as progress:
+        task_id = progress.add_task("Populating Tasks", total=total)
+        for idx, entry in enumerate(ts.iter_file_entries(data_folder)):
+            stat = entry.stat()
+            relpath = os.path.relpath(entry.path, data_folder).replace(os.sep, "/")
+            mtimes[relpath] = stat.st_mtime_ns
+            cached = file_cache.get(relpath)
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                results.append(TaskFast(idx, cached[2], relpath, stat.st_size, cached[3]))
+            else:
+                tasks.append(TaskFast(idx, None, entry.path, stat.st_size, None))
+            if idx % PROGRESS_BATCH == 0:
+                progress.update(task_id, completed=idx)
+        progress.update(task_id, completed=total)
+        if results:
+            log.debug(f"Using {len(results)} cached results from {cache_path.name}")
+
+        total = len(tasks)
+        chunksize = max(1, total // (cores * 4))
+        task_id = progress.add_task("Processing Files", total=total)
+        window = threading.Semaphore(PREFETCH_FACTOR * cores)
+        with ProcessPoolExecutor(
+            max_workers=cores, initializer=_init_worker, initargs=(func_path,)
+        ) as executor:
+            processed = executor.map(_process_task, tasks, chunksize=chunksize)
+            # Start prefetching only after worker processes have been forked
+            prefetcher = threading.Thread(
+                target=prefetch_files, args=([t.file for t in tasks], window), daemon=True
+            )
+            prefetcher.start()
+            for idx, result in enumerate(processed, start=1):
+                window.release()
+                if idx % PROGRESS_BATCH == 0:
+                    progress.update(task_id, completed=idx)
+                # Fix relative path
+                relpath = os.path.relpath(result.file, data_folder).replace(os.sep, "/")
+                result = result._replace(file=relpath)
+                if result.code is None:
+                    log.error(f"Failed {func.__name__} on {result.file}")
+                    continue
+                results.append(result)
+        progress.update(task_id, completed=total)
 
     # Sort results by index
     results = sorted(results, key=lambda obj: obj.id)
     with open(result_path, "wt", encoding="utf-8", newline="") as outf:
         writer = csv.writer(outf, delimiter=";")
         writer.writerow(["id", "code", "file", "size", "time"])
-        for item in results:
-            data = item.dict().values()
-            writer.writerow(data)
+        writer.writerows(results)
     log.debug(f"Results stored in {result_path}")
+    with open(cache_path, "wt", encoding="utf-8", newline="") as outf:
+        writer = csv.writer(outf, delimiter=";")
+        writer.writerow(["file", "mtime", "size", "code", "time"])
+        writer.writerows((r.file, mtimes[r.file], r.size, r.code, r.time) for r in results)
     return result_path
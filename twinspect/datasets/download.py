@@ -1,20 +1,28 @@
 """Specialized dataset download functions."""
+import atexit
+import json
+import os
 import random
+import shutil
+import struct
 import threading
 from concurrent.futures import as_completed, ThreadPoolExecutor
 from dataclasses import dataclass
-from functools import partial
+from functools import cache, partial
 from pathlib import Path
-from zipfile import ZipInfo
+from itertools import chain
+from typing import Callable, Iterator
+from zipfile import BadZipFile, ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
 from loguru import logger as log
 from remotezip import RemoteZip
 from twinspect.globals import progress
 from os import cpu_count
 from more_itertools import chunked_even
 from rich.filesize import decimal
-from rich.progress import Progress, TaskID
+from rich.progress import Progress, TaskID, track
 import tempfile
-from httpx import Client, HTTPError
+import zlib
+from httpx import Client, HTTPError, HTTPStatusError, Limits
 from urllib.parse import urlparse
 from twinspect.datasets.ultils import random_seed
 import twinspect as ts
@@ -26,64 +34,169 @@ __all__ = [
 ]
 
 
+HTTP_CACHE_FILE = "http-cache.json"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+ZIP_RUN_GAP = 256 * 1024
+ZIP_RUN_MAX_SIZE = 64 * 1024 * 1024
+ZIP_HEADER_PAD = 1024  # Allowance for local file header extra fields
+ZIP_LOCAL_SIGNATURE = b"PK\x03\x04"
+ZIP_COPY_BUFFER_SIZE = 256 * 1024
+_http_cache = None  # type: dict|None
+_http_cache_lock = threading.Lock()
+
+
 def download_multi(urls, target=None, workers=cpu_count(), dedupe=False):
     # type: (list[str], Path|None, int|None, bool|None) -> None
     """Download files from multiple urls in parallel while showing a progress bar.
 
-    Note: web servers must support head requests and return content-length headers
+    File metadata is read from the headers of the streaming GET responses, so no separate HEAD
+    requests are needed. The progress total grows as response headers arrive. All workers share
+    one connection pool sized to keep a persistent connection alive per worker.
 
     :param urls: List of urls to download files from.
     :param target: The directory to save the files to. If None, a temporary directory is created.
     :param workers: The number of threads to use for downloading. Default: number of CPUs.
-    :param dedupe: Skip downloads with duplicate content (based on ETags). Default: False
+    :param dedupe: Skip downloads with duplicate content (based on size and ETag). Of all urls
+        with the same content only the first one in sorted url order is kept. Responses without
+        ETag are never treated as duplicates. Default: False
     """
     # Dedupe duplicate urls (not duplicate content)
     num_urls_orig = len(urls)
-    urls = list(set(urls))
+    urls = sorted(set(urls))
     num_urls_dedup = len(urls)
     if num_urls_orig != num_urls_dedup:
         log.warning(f"Removed {num_urls_orig - num_urls_dedup} duplicate urls")
 
-    content_ids = {}  # Maps ETags to URLs
-
-    # Collect file metadata (FileInfo) and filter urls
-    with ThreadPoolExecutor(max_workers=workers) as pool:
-        with Client() as client:
-            func = partial(get_info, client=client)
-            file_infos = []
-            log.debug(f"Collect file infos for {len(urls)} urls with {workers} workers.")
-            for file_info in pool.map(func, urls):
-                file_info: FileInfo
-                if dedupe and file_info.etag in content_ids:
-                    log.debug(f"Skipped duplicate {file_info.url} == {content_ids[file_info.etag]}")
-                    continue
-                if not file_info.size:
-                    log.warning(f"No conent-length for {file_info}")
-                file_infos.append(file_info)
-                content_ids[file_info.etag] = file_info.url
-
-    total_size = sum(fi.size for fi in file_infos if fi.size)
-    human_size = decimal(total_size)
-    good_urls = [fi.url for fi in file_infos]
-    filename_size = {fi.url.split("/")[-1]: fi.size for fi in file_infos}
+    content_ids = {} if dedupe else None  # Maps (size, ETag) to lowest claiming url index
+    canonical = {}  # Maps (size, ETag) to the first retrieved url in url order
     target = target or Path(tempfile.mkdtemp())
+    if dedupe:
+        # Claim content of files from previous runs up front so that reruns skip their duplicates
+        for index, url in enumerate(urls):
+            file_path = Path(target) / urlparse(url).path.split("/")[-1]
+            validators = http_cache_get(url)
+            if validators and validators.get("etag") and file_path.exists():
+                content_id = (file_path.stat().st_size, validators["etag"])
+                claim_content(content_ids, content_id, index)
     counter = 0
-    log.debug(f"Download {len(file_infos)} files ({human_size}) with {workers} workers")
+    log.debug(f"Download {len(urls)} files with {workers} workers")
     with progress:
-        task_id = progress.add_task("download", name="Downloading", total=total_size)
+        task_id = progress.add_task("download", name="Downloading", total=0)
+        lock = threading.Lock()
         with ThreadPoolExecutor(max_workers=workers) as pool:
-            with Client() as client:
-                func = partial(download_file, target=target, client=client)
-                for file_path in pool.map(func, good_urls):
-                    if file_path:
-                        counter += 1
-                        log.debug(f"Retrieved {file_path.name}")
-                        progress.update(
-                            task_id, advance=filename_size[file_path.name], refresh=True
-                        )
+            limits = Limits(max_connections=workers, max_keepalive_connections=workers)
+            with Client(limits=limits) as client:
+                func = partial(
+                    fetch_file,
+                    target=target,
+                    client=client,
+                    content_ids=content_ids,
+                    progress_=progress,
+                    task_id=task_id,
+                    lock=lock,
+                )
+                for file_info in pool.map(func, urls, range(len(urls))):
+                    file_info: FileInfo
+                    if not file_info.path:
+                        continue
+                    # A higher index url may have claimed the content before a lower index url
+                    # (or in a previous run). Keep only the first retrieved file in url order.
+                    content_id = (file_info.size, file_info.etag)
+                    if dedupe and file_info.etag:
+                        if content_id in canonical:
+                            log.debug(f"Removed duplicate {file_info.path.name}")
+                            file_info.path.unlink(missing_ok=True)
+                            continue
+                        canonical[content_id] = file_info.url
+                    counter += 1
+                    log.debug(f"Retrieved {file_info.path.name}")
     log.debug(f"Downloded {counter} files to {target}")
 
 
+def fetch_file(url, index, target, client, content_ids, progress_, task_id, lock):
+    # type: (str, int, Path, Client, dict|None, Progress, TaskID, threading.Lock) -> FileInfo
+    """
+    Download a file with a single streaming GET request and collect its metadata.
+
+    A download is skipped as duplicate only if a url with a lower `index` already claimed the same
+    content, so that the kept files do not depend on the order in which responses arrive.
+
+    :param url: The URL of the file to download.
+    :param index: The position of the url in the sorted list of urls to download.
+    :param target: The directory to save the file to.
+    :param client: The HTTPX client to use for downloading.
+    :param content_ids: Shared mapping of (size, ETag) to the lowest claiming url index for
+        content deduplication or None.
+    :param progress_: The progress object to update the progress bar.
+    :param task_id: The task ID associated with the progress object.
+    :param lock: The lock object to synchronize access to content_ids and the progress object.
+    :return: FileInfo with `path` set to the downloaded (or already existing) file or None if
+        skipped or failed.
+    """
+    filename = urlparse(url).path.split("/")[-1]
+    file_path = Path(target) / filename
+    part_path = file_path.with_name(f"{filename}.part")
+
+    # Check and return pre-existing file (with the validators of its download for deduplication)
+    if file_path.exists():
+        log.debug(f"Using cached {file_path.name}")
+        validators = http_cache_get(url) or {}
+        size = file_path.stat().st_size
+        return FileInfo(url, size=size, etag=validators.get("etag"), path=file_path)
+
+    try:
+        with client.stream("GET", url) as response:
+            response.raise_for_status()
+            content_length = response.headers.get("content-length")
+            file_info = FileInfo(
+                url=str(response.url),
+                type=response.headers.get("content-type"),
+                size=int(content_length) if content_length else None,
+                etag=response.headers.get("etag"),
+                status=response.status_code,
+            )
+            content_id = (file_info.size, file_info.etag)
+            with lock:
+                if content_ids is not None and file_info.etag:
+                    if not claim_content(content_ids, content_id, index):
+                        log.debug(f"Skipped duplicate {url} (url #{content_ids[content_id]})")
+                        return file_info
+                if file_info.size:
+                    task = next(t for t in progress_.tasks if t.id == task_id)
+                    progress_.update(task_id, total=task.total + file_info.size)
+                else:
+                    log.warning(f"No conent-length for {file_info}")
+            with open(part_path, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as outfile:
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    outfile.write(chunk)
+                    progress_.update(task_id, advance=len(chunk))
+        os.replace(part_path, file_path)
+    except HTTPError as e:
+        log.error(repr(e))
+        part_path.unlink(missing_ok=True)
+        status = e.response.status_code if isinstance(e, HTTPStatusError) else None
+        return FileInfo(url, status=status)
+    http_cache_set(url, response.headers.get("etag"), response.headers.get("last-modified"))
+    file_info.path = file_path
+    return file_info
+
+
+def claim_content(content_ids, content_id, index):
+    # type: (dict, tuple[int|None, str], int) -> bool
+    """
+    Claim content for the url at `index` unless a url with a lower index already claimed it.
+
+    :param content_ids: Shared mapping of (size, ETag) to the lowest claiming url index.
+    :param content_id: The (size, ETag) tuple of the content to claim.
+    :param index: The position of the claiming url in the sorted list of urls.
+    :return: True if the content was claimed, False if it is a duplicate of a lower index url.
+    """
+    if content_ids.get(content_id, index) < index:
+        return False
+    content_ids[content_id] = index
+    return True
+
+
 def download_file(url, target=None, client=None, overwrite=False):
     # type: (str, Path|None, Client|None, bool|None) -> Path|None
     """
@@ -91,8 +204,10 @@ def download_file(url, target=None, client=None, overwrite=False):
 
     :param url: The URL of the file to download.
     :param target: The directory to save the file to. If None, the root_folder is used.
-    :param client: The HTTPX client to use for downloading. If None, a new client is created.
+    :param client: The HTTPX client to use for downloading. If None, the shared client is used.
     :param overwrite: Overwrite exiting file. Default is False and does not redownload if exists.
+        Existing files are revalidated with a conditional request and only redownloaded if
+        they changed on the server.
     :return: The path of the downloaded file or None if an error occurs during the download process.
     """
     filename = urlparse(url).path.split("/")[-1]
@@ -104,20 +219,93 @@ def download_file(url, target=None, client=None, overwrite=False):
         log.debug(f"Using cached {file_path.name}")
         return file_path
 
-    # Streaming file download
+    # Revalidate pre-existing file with a conditional request
+    headers = {}
+    validators = http_cache_get(url) if file_path.exists() else None
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    # Streaming file download (atomically moved into place when complete)
     log.debug(f"Downloading {filename}")
-    client = client or Client()
-    with open(file_path, "wb") as outfile:
-        try:
-            with client.stream("GET", url) as instream:
-                for chunk in instream.iter_bytes():
+    client = client or get_client()
+    part_path = file_path.with_name(f"{filename}.part")
+    try:
+        with client.stream("GET", url, headers=headers) as instream:
+            if instream.status_code == 304:
+                log.debug(f"Using unchanged {file_path.name}")
+                return file_path
+            instream.raise_for_status()
+            with open(part_path, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as outfile:
+                for chunk in instream.iter_bytes(DOWNLOAD_CHUNK_SIZE):
                     outfile.write(chunk)
-        except HTTPError as e:
-            log.error(repr(e))
-            return None
+        os.replace(part_path, file_path)
+    except HTTPError as e:
+        log.error(repr(e))
+        part_path.unlink(missing_ok=True)
+        return None
+    http_cache_set(url, instream.headers.get("etag"), instream.headers.get("last-modified"))
     return file_path
 
 
+@cache
+def get_client():
+    # type: () -> Client
+    """
+    Return a process wide shared HTTPX client to reuse pooled connections across downloads.
+
+    The client is closed automatically at interpreter exit.
+    """
+    client = Client()
+    atexit.register(client.close)
+    return client
+
+
+def http_cache_get(url):
+    # type: (str) -> dict|None
+    """
+    Get cached HTTP validators (ETag/Last-Modified) of a previous download from `url`.
+
+    The cache is persisted as JSON in the root_folder and loaded once per process.
+
+    :param url: The URL of the previously downloaded file.
+    :return: Dict with `etag` and `last_modified` entries or None if url is not cached.
+    """
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            cache_path = Path(ts.opts.root_folder) / HTTP_CACHE_FILE
+            _http_cache = {}
+            if cache_path.exists():
+                try:
+                    _http_cache = json.loads(cache_path.read_text(encoding="utf-8"))
+                except ValueError as e:
+                    log.warning(f"Ignoring broken http cache {cache_path.name} - {e}")
+        return _http_cache.get(url)
+
+
+def http_cache_set(url, etag, last_modified):
+    # type: (str, str|None, str|None) -> None
+    """
+    Store HTTP validators of a completed download from `url` in the persistent cache.
+
+    :param url: The URL of the downloaded file.
+    :param etag: The ETag response header of the download.
+    :param last_modified: The Last-Modified response header of the download.
+    """
+    if not (etag or last_modified):
+        return
+    http_cache_get(url)  # Make sure the cache is loaded
+    cache_path = Path(ts.opts.root_folder) / HTTP_CACHE_FILE
+    with _http_cache_lock:
+        _http_cache[url] = {"etag": etag, "last_modified": last_modified}
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(_http_cache, indent=2), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+
+
 def download_samples(url, num_samples, target=None, filter_=None, seed=0):
     # type: (str, int, Path|None, str|None, int) -> Path
     """Download a number of random samples from a remote zip file in parallel with progress bar.
@@ -144,6 +332,9 @@ def zip_download(url, files, target, workers=cpu_count()):
     """
     Download individual files from a zip archive without downloading the full content.
 
+    Members with nearby byte ranges are coalesced into runs that are fetched with a single HTTP
+    range request each (see `zip_runs`).
+
     :param url: The URL of the remote zip file.
     :param files: List of ZipInfo objects representing the samples to be downloaded.
     :param target: The target directory where the samples will be saved.
@@ -151,42 +342,266 @@ def zip_download(url, files, target, workers=cpu_count()):
     """
     total_size = sum(info.file_size for info in files)
     human_size = decimal(total_size)
-    log.debug(f"Download {len(files)} files ({human_size}) with {workers} workers")
+    runs = zip_runs(files)
+    log.debug(
+        f"Download {len(files)} files ({human_size}) in {len(runs)} runs with {workers} workers"
+    )
     with progress:
         task_id = progress.add_task("download", name="Remote Zip Extraction", total=total_size)
         lock = threading.Lock()
-        with ThreadPoolExecutor() as executor:
-            sample_batches = chunked_even(files, workers)
+        # Fallback archive is opened at most once and shared by all workers
+        open_remote_zip = cache(partial(RemoteZip, url))
+        with ThreadPoolExecutor() as executor, Client(follow_redirects=True) as client:
+            run_batches = chunked_even(runs, workers)
             futures = []
-            for batch in sample_batches:
+            for batch in run_batches:
                 fut = executor.submit(
-                    zip_download_worker, url, batch, target, progress, task_id, lock
+                    zip_download_worker,
+                    url,
+                    batch,
+                    target,
+                    progress,
+                    task_id,
+                    lock,
+                    client,
+                    open_remote_zip,
                 )
                 futures.append(fut)
             for future in as_completed(futures):
                 batch_size: int = future.result()
                 log.debug(f"Finished batch of {batch_size} files")
+        if open_remote_zip.cache_info().currsize:
+            open_remote_zip().close()
 
 
-def zip_download_worker(url, samples, target, progress_, task_id, lock):
-    # type: (str, list[ZipInfo], Path, Progress, TaskID, threading.Lock) -> int
+def zip_extract(zip_path, files, target):
+    # type: (Path, list[ZipInfo], Path) -> None
+    """
+    Extract individual files from a local zip archive with a single shared archive handle.
+
+    :param zip_path: Path to the local zip file.
+    :param files: List of ZipInfo objects representing the files to be extracted.
+    :param target: The target directory where the files will be saved.
+    """
+    log.debug(f"Extract {len(files)} files from {zip_path.name}")
+    with ZipFile(zip_path) as zfile:
+        for zinfo in track(files, description="Zip Extraction", console=progress.console):
+            zip_copy_member(zfile, zinfo, target)
+
+
+def zip_copy_member(zfile, zinfo, target, buffer_size=ZIP_COPY_BUFFER_SIZE):
+    # type: (ZipFile, ZipInfo, Path, int) -> None
+    """
+    Extract a zip member by copying it with a large buffer instead of `ZipFile.extract`.
+
+    :param zfile: The (remote) zip archive to extract from.
+    :param zinfo: The ZipInfo object of the member to extract.
+    :param target: The target directory where the member will be saved.
+    :param buffer_size: Number of bytes to copy per read/write call.
+    """
+    file_path = zip_member_path(zinfo, target)
+    if file_path is None or zinfo.is_dir():
+        zfile.extract(zinfo, target)
+        return
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with zfile.open(zinfo) as infile, open(file_path, "wb") as outfile:
+        shutil.copyfileobj(infile, outfile, buffer_size)
+
+
+def zip_runs(files, gap=ZIP_RUN_GAP, max_size=ZIP_RUN_MAX_SIZE):
+    # type: (list[ZipInfo], int, int) -> list[list[ZipInfo]]
+    """
+    Group zip archive members into runs of nearby byte ranges ordered by archive offset.
+
+    :param files: List of ZipInfo objects to be grouped.
+    :param gap: Maximum number of unused bytes between two members of the same run.
+    :param max_size: Maximum number of bytes covered by a single run.
+    :return: List of runs each holding one or more ZipInfo objects.
+    """
+    runs = []
+    run_start = run_end = 0
+    for zinfo in sorted(files, key=lambda info: info.header_offset):
+        start, end = zinfo.header_offset, zip_member_end(zinfo)
+        if runs and start - run_end <= gap and end - run_start <= max_size:
+            runs[-1].append(zinfo)
+            run_end = max(run_end, end)
+        else:
+            runs.append([zinfo])
+            run_start, run_end = start, end
+    return runs
+
+
+def zip_member_end(zinfo):
+    # type: (ZipInfo) -> int
+    """Estimate the (exclusive) end offset of a zip member including its local file header."""
+    name_size = len(zinfo.orig_filename.encode("utf-8"))
+    return zinfo.header_offset + 30 + name_size + ZIP_HEADER_PAD + zinfo.compress_size
+
+
+def zip_download_worker(url, runs, target, progress_, task_id, lock, client, open_remote_zip):
+    # type: (str, list[list], Path, Progress, TaskID, threading.Lock, Client, Callable) -> int
     """A worker thread for download of multiple members from a remote zip archive.
 
+    Each run of members is fetched with a single range request and split into members by their
+    local file headers. Runs of a single stored (uncompressed) member are streamed to disk without
+    buffering. Members that cannot be extracted from the fetched bytes (unsupported compression,
+    encryption or oversized headers) fall back to RemoteZip extraction.
+
     :param url: The URL of the remote zip file.
-    :param samples: List of ZipInfo objects representing the samples to be downloaded.
+    :param runs: List of runs of ZipInfo objects representing the samples to be downloaded.
     :param target: The target directory where the samples will be saved.
     :param progress_: The progress object to update the progress bar.
     :param task_id: The task ID associated with the progress object.
     :param lock: The lock object to synchronize access to the progress object.
+    :param client: The HTTPX client to use for range requests.
+    :param open_remote_zip: Callable returning the shared RemoteZip for fallback extraction.
     :return: The number of downloaded samples.
     """
-    with RemoteZip(url) as zipfile:
-        for zinfo in samples:
-            zipfile.extract(zinfo, target)
+    counter = 0
+    for run in runs:
+        start = run[0].header_offset
+        end = max(zip_member_end(zinfo) for zinfo in run)
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        extracted = set()
+        with client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                pass  # Server ignored range request
+            elif len(run) == 1 and run[0].compress_type == ZIP_STORED:
+                chunks = response.iter_bytes(DOWNLOAD_CHUNK_SIZE)
+                if zip_stream_stored(chunks, run[0], target):
+                    extracted.add(run[0].filename)
+            else:
+                data = response.read()
+                for zinfo in run:
+                    if zip_extract_member(data, start, zinfo, target):
+                        extracted.add(zinfo.filename)
+        for zinfo in run:
+            if zinfo.filename not in extracted:
+                with lock:
+                    remote_zip = open_remote_zip()
+                zip_copy_member(remote_zip, zinfo, target, DOWNLOAD_CHUNK_SIZE)
             log.debug(f"Retrieved {zinfo.filename}")
+            counter += 1
             with lock:
                 progress_.update(task_id, advance=zinfo.file_size, refresh=True)
-    return len(samples)
+    return counter
+
+
+def zip_extract_member(data, offset, zinfo, target):
+    # type: (bytes, int, ZipInfo, Path) -> bool
+    """
+    Extract a zip member from a buffer of raw archive bytes.
+
+    :param data: Raw archive bytes starting at archive position `offset`.
+    :param offset: Archive position of the first byte in `data`.
+    :param zinfo: The ZipInfo object of the member to extract.
+    :param target: The target directory where the member will be saved.
+    :return: True if the member was extracted, False if it must be extracted otherwise.
+    """
+    file_path = zip_member_path(zinfo, target)
+    if file_path is None:
+        return False
+    content = zip_member_data(data, offset, zinfo)
+    if content is None:
+        return False
+    if zinfo.is_dir():
+        file_path.mkdir(parents=True, exist_ok=True)
+        return True
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "wb") as outfile:
+        outfile.write(content)
+    return True
+
+
+def zip_member_data(data, offset, zinfo):
+    # type: (bytes, int, ZipInfo) -> bytes|memoryview|None
+    """
+    Decode the content of a zip member from a buffer of raw archive bytes.
+
+    :param data: Raw archive bytes starting at archive position `offset`.
+    :param offset: Archive position of the first byte in `data`.
+    :param zinfo: The ZipInfo object of the member to decode.
+    :return: The member content or None if it must be extracted otherwise.
+    """
+    pos = zinfo.header_offset - offset
+    if zinfo.flag_bits & 0x1 or data[pos : pos + 4] != ZIP_LOCAL_SIGNATURE:
+        return None
+    name_size, extra_size = struct.unpack_from("<HH", data, pos + 26)
+    data_start = pos + 30 + name_size + extra_size
+    raw = memoryview(data)[data_start : data_start + zinfo.compress_size]
+    if len(raw) < zinfo.compress_size:
+        return None
+    if zinfo.compress_type == ZIP_STORED:
+        content = raw
+    elif zinfo.compress_type == ZIP_DEFLATED:
+        content = zlib.decompress(raw, -zlib.MAX_WBITS)
+    else:
+        return None
+    if zlib.crc32(content) != zinfo.CRC:
+        raise BadZipFile(f"Bad CRC-32 for file {zinfo.filename}")
+    return content
+
+
+def zip_stream_stored(chunks, zinfo, target):
+    # type: (Iterator[bytes], ZipInfo, Path) -> bool
+    """
+    Stream a stored (uncompressed) zip member from raw archive bytes directly to disk.
+
+    :param chunks: Iterator of raw archive bytes starting at the members local file header.
+    :param zinfo: The ZipInfo object of the member to extract.
+    :param target: The target directory where the member will be saved.
+    :return: True if the member was extracted, False if it must be extracted otherwise.
+    """
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= 30:
+            break
+    file_path = zip_member_path(zinfo, target)
+    if file_path is None or zinfo.is_dir() or len(head) < 30:
+        return False
+    if head[:4] != ZIP_LOCAL_SIGNATURE:
+        return False
+    name_size, extra_size = struct.unpack_from("<HH", head, 26)
+    data_start = 30 + name_size + extra_size
+    while len(head) < data_start:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        head += chunk
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    remaining, crc = zinfo.compress_size, 0
+    with open(file_path, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as outfile:
+        for chunk in chain([head[data_start:]], chunks):
+            chunk = memoryview(chunk)[:remaining]
+            outfile.write(chunk)
+            crc = zlib.crc32(chunk, crc)
+            remaining -= len(chunk)
+            if not remaining:
+                break
+    if remaining:
+        return False
+    if crc != zinfo.CRC:
+        raise BadZipFile(f"Bad CRC-32 for file {zinfo.filename}")
+    return True
+
+
+def zip_member_path(zinfo, target):
+    # type: (ZipInfo, Path) -> Path|None
+    """
+    Return the target path for a zip member if it can be extracted without `ZipFile.extract`.
+
+    :param zinfo: The ZipInfo object of the member to extract.
+    :param target: The target directory where the member will be saved.
+    :return: Target file path or None if the member must be extracted with zipfile.
+    """
+    if zinfo.flag_bits & 0x1:
+        return None  # Encrypted
+    member_path = Path(zinfo.filename)
+    if member_path.is_absolute() or ".." in member_path.parts:
+        return None  # Leave path sanitization to zipfile
+    return target / member_path
 
 
 def zip_samples(url, num_samples, filter_=None, seed=0):
@@ -222,6 +637,7 @@ class FileInfo:
     size: int | None = None
     etag: str | None = None
     status: int | None = None
+    path: Path | None = None
 
 
 def get_info(url, client=None):
@@ -1,24 +1,30 @@
-import csv
 import io
 import os
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 import zipfile
 import blake3
+import pandas as pd
 from codetiming import Timer
 from pathlib import Path
+from typing import Iterator
 from remotezip import RemoteZip
 import random
 from loguru import logger as log
-from rich.progress import Progress
 import twinspect as ts
-from twinspect.datasets.integrity import check_dir_fast
-from twinspect.datasets.ultils import clusterize
+from twinspect.datasets.download import download_file, zip_download, zip_extract
+from twinspect.datasets.integrity import check_dir_fast, hash_file_secure
+from twinspect.datasets.ultils import clusterize, random_seed
 from twinspect.transformations.transform import transform_data_folder
 from twinspect.models import Dataset
 from twinspect.options import opts
 from twinspect.tools import count_files
-from twinspect.globals import console
-from twinspect.datasets.integrity import hash_file_secure
+
+
+FULL_DOWNLOAD_RATIO = 0.3  # Share of archive members above which we download the full archive
 
 
 def install(dataset):
@@ -73,61 +79,91 @@ def download_fma_samples(num_samples, seed, url):
     # Collect, download and extract samples
     download_folder.mkdir(parents=True)
     audio_file_names = load_file_names(60)  # Minimum 60 seconds
-    with RemoteZip(url) as zfile:
-        random.seed(seed)
-        num_names = int(num_samples + (num_samples // 10))  # add 10% margin to filter dupes
-        sample_file_names = random.sample(audio_file_names, num_names)
+    # The temporary folder (on the same volume as the dataset) holds a full archive download and
+    # is removed after extraction
+    with RemoteZip(url) as zfile, tempfile.TemporaryDirectory(dir=opts.root_folder) as tmp_dir:
+        sample_file_names = iter_sample_names(audio_file_names, num_samples, seed)
+
+        # Fetch the full archive once if a large share of it is needed anyway
+        archive = None
+        if num_samples > len(zfile.infolist()) * FULL_DOWNLOAD_RATIO:
+            log.debug(f"Download full archive for local extraction of {num_samples} samples")
+            archive = download_file(url, target=Path(tmp_dir))
+            if archive is None:
+                log.warning("Full archive download failed - falling back to remote extraction")
+        if archive:
+            fetch_files = partial(zip_extract, archive)
+        else:
+            fetch_files = partial(zip_download, url)
 
-        # Extract examples
-        hashes = set()
+        # Extract examples in concurrent rounds of exactly the number of samples still missing
+        hashes = set()  # 64-bit digest prefixes are sufficient to detect duplicates
         hasher = blake3.blake3()
         counter = 0
 
-        with Progress(console=console) as prog:
-            task = prog.add_task(f"Dowloading {download_folder.name}", total=num_samples)
-            for sfn in sample_file_names:
-                file_path = zfile.extract(sfn, download_folder)
-                log.debug(f"Retrieved {sfn}")
-                file_hash = hash_file_secure(Path(file_path))
-                if file_hash not in hashes:
+        while counter < num_samples:
+            names = list(islice(sample_file_names, num_samples - counter))
+            if not names:
+                log.error(f"Found only {counter} unique files for {download_folder.name}")
+                break
+            batch = [zfile.getinfo(name) for name in names]
+            fetch_files(batch, download_folder)
+            file_paths = [download_folder / name for name in names]
+            with ThreadPoolExecutor() as executor:
+                file_hashes = list(executor.map(hash_file_secure, file_paths))
+
+            # Dedupe in candidate order to select the same files as a sequential download
+            for file_path, file_hash in zip(file_paths, file_hashes):
+                hash_key = int.from_bytes(file_hash[:8], "big")
+                if hash_key not in hashes:
                     hasher.update(file_hash)
-                    hashes.add(file_hash)
+                    hashes.add(hash_key)
                     counter += 1
-                    prog.update(task, advance=1)
-                    if counter == num_samples:
-                        log.info(f"Downloaded {counter} files to {download_folder}")
-                        break
                 else:
-                    log.warning(f"Delete duplicate file {Path(file_path).name}")
+                    log.warning(f"Delete duplicate file {file_path.name}")
                     os.remove(file_path)
+    log.info(f"Downloaded {counter} files to {download_folder}")
     return download_folder
 
 
+def iter_sample_names(file_names, num_samples, seed):
+    # type: (list[str], int, int) -> Iterator[str]
+    """
+    Yield sample file names in deterministic random order to be consumed until enough unique
+    samples are downloaded.
+
+    The leading names are the `random.sample` selection with a 10% margin for duplicates used by
+    earlier versions, which keeps existing dataset checksums stable. Only if duplicates exhaust
+    this margin the remaining file names follow in seeded random order.
+
+    :param file_names: Population of file names to sample from.
+    :param num_samples: Number of unique samples that will be consumed.
+    :param seed: Seed for reproducible random ordering.
+    """
+    with random_seed(seed):
+        num_names = min(len(file_names), num_samples + (num_samples // 10))
+        selected = random.sample(file_names, num_names)
+    yield from selected
+    selected = set(selected)
+    remaining = [fn for fn in file_names if fn not in selected]
+    random.Random(seed).shuffle(remaining)
+    yield from remaining
+
+
 def load_file_names(min_duration):
     # type: (int) -> list
     """Load file names from FMA-Large dataset filtered by minimum duration"""
 
-    from twinspect.datasets.download import download_file
-
     # Cached download of metadata zip file
     fma_meta_url = "https://os.unil.cloud.switch.ch/fma/fma_metadata.zip"
     zip_file_path = download_file(fma_meta_url)
 
     log.debug(f"Loading FMA file names with {min_duration}s minimum duration")
-    zip_obj = zipfile.ZipFile(zip_file_path)
     csv_file = "fma_metadata/tracks.csv"  # Track-ID = col 0 / Duration = col 38
-    file_names = []
-    with zip_obj.open(csv_file) as infile:
-        text_stream = io.TextIOWrapper(infile, encoding="utf-8")
-        reader = csv.reader(text_stream)
-        skip = 3
-        for _ in range(skip):
-            next(reader)
-
-        for row in reader:
-            track_id, duration = row[0], row[38]
-            if int(duration) >= min_duration:
-                track_id = track_id.zfill(6)
-                file_path = f"fma_full/{track_id[:3]}/{track_id}.mp3"
-                file_names.append(file_path)
+    # Decompress in a single call and parse from memory
+    with zipfile.ZipFile(zip_file_path) as zip_obj:
+        data = io.BytesIO(zip_obj.read(csv_file))
+    df = pd.read_csv(data, skiprows=3, header=None, usecols=[0, 38], dtype={0: str})
+    track_ids = df.loc[df[38] >= min_duration, 0].str.zfill(6)
+    file_names = ("fma_full/" + track_ids.str[:3] + "/" + track_ids + ".mp3").tolist()
     return file_names
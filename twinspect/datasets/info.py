@@ -1,6 +1,7 @@
+from collections import Counter
 from pathlib import Path
 import numpy as np
-from twinspect.datasets.integrity import iter_file_meta, check_dir_fast
+from twinspect.datasets.integrity import iter_file_meta, checksum_from_meta
 from twinspect.models import DatasetInfo
 import iscc_sdk as idk
 from loguru import logger as log
@@ -14,12 +15,13 @@ def dataset_info(data_folder):
     # Variables to store information
     total_size = 0
     total_files = 0
-    clusters = {}
+    clusters = Counter()
     transformations = set()
     dataset_mode = ""
 
-    # Iterate over the files in the data folder
-    for relpath, size, _ in iter_file_meta(data_folder):
+    # Iterate over the files in the data folder (collected once for the checksum)
+    file_meta = list(iter_file_meta(data_folder))
+    for relpath, size, _ in file_meta:
         # Detect mode from first file only
         if total_files == 0:
             _, dataset_mode = idk.mediatype_and_mode((data_folder / relpath).as_posix())
@@ -30,7 +32,7 @@ def dataset_info(data_folder):
         # If the file is in a cluster
         if len(relpath.parts) > 1:
             cluster_name = relpath.parts[0]
-            clusters.setdefault(cluster_name, []).append(relpath)
+            clusters[cluster_name] += 1
 
             # Check for transformations
             if "_" in relpath.name:
@@ -38,9 +40,9 @@ def dataset_info(data_folder):
                 transformations.add(transform)
 
     # Calculate cluster and distractor information
-    cluster_sizes = [len(files) for files in clusters.values()]
+    cluster_sizes = np.fromiter(clusters.values(), dtype=np.int64, count=len(clusters))
     total_clusters = len(clusters)
-    total_distractor_files = total_files - sum(cluster_sizes)
+    total_distractor_files = total_files - int(cluster_sizes.sum())
 
     # Calculate the ratio of cluster files to distractor files
     ratio_cluster_to_distractor = (
@@ -50,15 +52,16 @@ def dataset_info(data_folder):
     )
 
     # Calculate cluster size distribution
+    has_clusters = cluster_sizes.size > 0
     cluster_sizes_distribution = {
-        "min": min(cluster_sizes) if cluster_sizes else 0,
-        "max": max(cluster_sizes) if cluster_sizes else 0,
-        "mean": np.mean(cluster_sizes) if cluster_sizes else 0,
-        "median": np.median(cluster_sizes) if cluster_sizes else 0,
+        "min": int(cluster_sizes.min()) if has_clusters else 0,
+        "max": int(cluster_sizes.max()) if has_clusters else 0,
+        "mean": float(cluster_sizes.mean()) if has_clusters else 0,
+        "median": float(np.median(cluster_sizes)) if has_clusters else 0,
     }
 
     # Calculate the checksum
-    checksum = check_dir_fast(data_folder)
+    checksum = checksum_from_meta(file_meta)
 
     # Return the dataset information
     result = {
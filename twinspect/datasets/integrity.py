@@ -22,9 +22,12 @@ TODO: The performance of check_dir_secure can be improved 10x for directories wi
       files by using asynchronous file IO (aiofiles package).
 """
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import Iterator, Optional, Tuple
+from typing import Iterable, Iterator, Optional, Tuple
 from blake3 import blake3
 from loguru import logger as log
 from rich.progress import (
@@ -41,11 +44,17 @@ from twinspect import console
 __all__ = [
     "check_dir_fast",
     "check_dir_secure",
+    "checksum_from_meta",
     "hash_file_secure",
     "iter_file_meta",
 ]
 
 
+THREADED_HASH_MIN_SIZE = 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+SMALL_FILE_SIZE = 64 * 1024
+
+
 def check_dir_fast(path, expected=None, raise_empty=True):
     # type: (str|Path, Optional[str], bool) -> str
     """
@@ -68,16 +77,7 @@ def check_dir_fast(path, expected=None, raise_empty=True):
     else:
         log.debug(f"Calculating checksum for {path.name}")
     path = Path(path)
-    hasher = blake3(max_threads=blake3.AUTO)
-    for file, size, time in iter_file_meta(path):
-        if size <= 0:
-            if raise_empty:
-                raise EmptyFileError(file)
-            else:
-                log.warning(f"Empty file {file}")
-        ident = f"{file};{size}".encode("utf-8")
-        hasher.update(ident)
-    actual_hash = hasher.hexdigest(8)
+    actual_hash = checksum_from_meta(iter_file_meta(path), raise_empty=raise_empty)
     if expected:
         if expected == actual_hash:
             log.info(f"Success verifying {path.name}")
@@ -87,6 +87,33 @@ def check_dir_fast(path, expected=None, raise_empty=True):
     return actual_hash
 
 
+def checksum_from_meta(file_meta, raise_empty=True):
+    # type: (Iterable[Tuple[Path, int, float]], bool) -> str
+    """
+    Compute the fast 64-bit directory checksum (see `check_dir_fast`) from file metadata tuples.
+
+    Allows callers that already walked a directory with `iter_file_meta` to reuse the collected
+    metadata instead of walking the directory tree again.
+
+    :param file_meta: File metadata tuples (relpath, size, mtime) in `iter_file_meta` order.
+    :param raise_empty: Raise error when encountering empty (0-bytes) files.
+    :returns: Hex encoded calculated checksum
+    :raises EmptyFileError: If raise_empty is True, and we encounter a zero-byte file.
+    """
+    idents = []
+    for file, size, time in file_meta:
+        if size <= 0:
+            if raise_empty:
+                raise EmptyFileError(file)
+            else:
+                log.warning(f"Empty file {file}")
+        idents.append(f"{file};{size}")
+    # Hash all identifiers with one update (same digest as incremental updates)
+    data = "".join(idents).encode("utf-8")
+    threads = blake3.AUTO if len(data) >= THREADED_HASH_MIN_SIZE else 1
+    return blake3(data, max_threads=threads).hexdigest(8)
+
+
 def check_dir_secure(path, expected=None, raise_dupes=True):
     # type: (str|Path, Optional[str], bool) -> str
     """
@@ -105,17 +132,15 @@ def check_dir_secure(path, expected=None, raise_dupes=True):
     """
     log.debug(f"Compute secure check: {path}, expected={expected}, raise_dupes={raise_dupes}")
     path = Path(path)
-    file_paths_rel = []
-    file_sizes = []
-
+    # Collect and partition (relpath, size) entries in a single metadata pass
+    files, small_files, large_files = [], [], []
+    total_size = 0
     for relpath, size, _ in iter_file_meta(path):
-        file_paths_rel.append(relpath)
-        file_sizes.append(size)
+        files.append((relpath, size))
+        (small_files if size < SMALL_FILE_SIZE else large_files).append((relpath, size))
+        total_size += size
 
-    file_sizes_dict = {rel_path: size for rel_path, size in zip(file_paths_rel, file_sizes)}
-    hasher = blake3(max_threads=blake3.AUTO)
-
-    total_size = sum(file_sizes)
+    hasher = blake3()
     progress = Progress(
         TextColumn("[bold blue]Hashing {task.fields[dirname]}", justify="right"),
         BarColumn(),
@@ -129,31 +154,40 @@ def check_dir_secure(path, expected=None, raise_dupes=True):
         console=console,
     )
 
-    with progress:
+    with progress, ExitStack() as stack:
         task_id = progress.add_task("Hashing", dirname=path.name, total=total_size)
         seen_files = {}
-        cores = os.cpu_count()
+        readers = read_concurrency(path)
+        if readers == 1:
+            # Single reader (rotational disk): hash all files in walk order in this process
+            file_hashes = (hash_file_secure(path / rel_path) for rel_path, _ in files)
+            entries = zip(files, file_hashes)
+        else:
+            workers = min(readers, os.cpu_count())
+            chunksize = max(1, len(large_files) // (workers * 4))
+
+            # Hash large files in worker processes (blake3 only releases the GIL for larger
+            # inputs). Workers hash single-threaded: processes already run in parallel and forked
+            # children would hang on a blake3 thread pool inherited from earlier hashing.
+            executor = stack.enter_context(ProcessPoolExecutor(workers))
+            file_paths = [path / rel_path for rel_path, _ in large_files]
+            hash_func = partial(hash_file_secure, max_threads=1)
+            large_hashes = executor.map(hash_func, file_paths, chunksize=chunksize)
 
-        with ThreadPoolExecutor(cores * 4) as executor:
-            # Submit hashing tasks
-            hashing_futures = {
-                executor.submit(hash_file_secure, path / rel_path): rel_path
-                for rel_path in file_paths_rel
-            }
+            # Hash small files inline while workers process large ones (dispatch costs more)
+            small_hashes = (blake3((path / rp).read_bytes()).digest() for rp, _ in small_files)
 
-            # Process completed hashing tasks
-            for future in as_completed(hashing_futures):
-                rel_path = hashing_futures[future]
-                file_hash = future.result()
+            entries = chain(zip(small_files, small_hashes), zip(large_files, large_hashes))
 
-                if file_hash in seen_files:
-                    if raise_dupes:
-                        raise DuplicateFileError(rel_path, seen_files[file_hash])
-                    else:
-                        log.warning(f"Duplicate file {rel_path} == {seen_files[file_hash]}")
+        for (rel_path, size), file_hash in entries:
+            if file_hash in seen_files:
+                if raise_dupes:
+                    raise DuplicateFileError(rel_path, seen_files[file_hash])
+                else:
+                    log.warning(f"Duplicate file {rel_path} == {seen_files[file_hash]}")
 
-                seen_files[file_hash] = rel_path
-                progress.update(task_id, advance=file_sizes_dict[rel_path], refresh=True)
+            seen_files[file_hash] = rel_path
+            progress.update(task_id, advance=size)
 
         # Hash sorted file hashes
         for file_hash, _ in sorted(seen_files.items(), key=lambda x: x[1]):
@@ -171,8 +205,59 @@ def check_dir_secure(path, expected=None, raise_dupes=True):
     return dirhash
 
 
-def hash_file_secure(file_path) -> bytes:
-    return blake3(file_path.read_bytes(), max_threads=blake3.AUTO).digest()
+def hash_file_secure(file_path, max_threads=blake3.AUTO):
+    # type: (str|Path, int) -> bytes
+    """
+    Compute a secure 256-bit blake3 hash of the file content.
+
+    Large files are hashed with multiple threads (memory mapped if the installed blake3 supports
+    `update_mmap`, streamed in chunks otherwise). Small files are hashed single-threaded as thread
+    startup would dominate the hashing time.
+
+    :param file_path: Path to the file to be hashed.
+    :param max_threads: Maximum number of threads for hashing large files. Default: all cores.
+    :return: Raw 32-byte blake3 digest.
+    """
+    file_path = Path(file_path)
+    if file_path.stat().st_size < THREADED_HASH_MIN_SIZE:
+        return blake3(file_path.read_bytes()).digest()
+    hasher = blake3(max_threads=max_threads)
+    if hasattr(hasher, "update_mmap"):
+        hasher.update_mmap(file_path)
+    else:
+        # Bounded memory streaming for blake3 builds without mmap support
+        with file_path.open("rb") as infile:
+            for chunk in iter(lambda: infile.read(HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+    return hasher.digest()
+
+
+def read_concurrency(path):
+    # type: (str|Path) -> int
+    """
+    Return the number of parallel file readers suited for the storage device holding `path`.
+
+    Rotational disks (detected via sysfs on Linux) are read by a single thread as parallel reads
+    cause seek contention and lower the aggregate throughput. Other devices use `cpu_count * 4`.
+
+    :param path: Path to a file or folder on the storage device.
+    :return: Number of parallel readers.
+    """
+    readers = os.cpu_count() * 4
+    try:
+        dev = os.stat(path).st_dev
+        block = Path(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}").resolve()
+        # Partitions have no queue attributes of their own, so check the parent disk too
+        for queue in (block / "queue", block.parent / "queue"):
+            rotational = queue / "rotational"
+            if rotational.exists():
+                if rotational.read_text().strip() == "1":
+                    log.debug(f"Reading sequentially from rotational disk {block.name}")
+                    readers = 1
+                break
+    except (AttributeError, OSError):
+        pass  # No sysfs device information (non-Linux platform)
+    return readers
 
 
 def iter_file_meta(path, root_path=None):
@@ -189,24 +274,34 @@ def iter_file_meta(path, root_path=None):
     File-entries are yielded in reproducible and deterministic order (bottom-up). Symlincs are
     ignored silently.
 
-    Implementation Note: We use os.scandir to reduce the number of syscalls for metadata collection.
+    Implementation Note: We use os.scandir to reduce the number of syscalls for metadata collection
+    and walk iteratively on relative path strings to avoid recursion and pathlib overhead.
     """
-    root_path = Path(root_path or path)
-    with os.scandir(path) as entries:
-        # Sort the entries
-        sorted_entries = sorted(entries, key=lambda e: e.name)
-
-        # Separate directories and files
-        dirs = [entry for entry in sorted_entries if entry.is_dir()]
-        files = [entry for entry in sorted_entries if entry.is_file()]
-
-        # Recursively process directories first (bottom-up traversal)
-        for dir_entry in dirs:
-            yield from iter_file_meta(Path(dir_entry.path), root_path=root_path)
+    rel_path = Path(path).relative_to(root_path) if root_path else Path()
+    prefix = os.path.join(rel_path, "") if rel_path.parts else ""
+
+    # Iterative depth-first walk with an explicit stack of (subdir-iterator, files, prefix) frames
+    stack = [_scan_dir(path, prefix)]
+    while stack:
+        subdirs, files, prefix = stack[-1]
+        # Process directories first (bottom-up traversal)
+        dir_entry = next(subdirs, None)
+        if dir_entry is not None:
+            stack.append(_scan_dir(dir_entry.path, prefix + dir_entry.name + os.sep))
+            continue
+        stack.pop()
 
         # Process files in the current directory
         for file_entry in files:
-            relative_path = Path(file_entry).relative_to(root_path)
-            file_size = file_entry.stat().st_size
-            mtime = file_entry.stat().st_mtime
-            yield relative_path, file_size, mtime
+            stat = file_entry.stat()
+            yield Path(prefix + file_entry.name), stat.st_size, stat.st_mtime
+
+
+def _scan_dir(path, prefix):
+    # type: (str|Path, str) -> Tuple[Iterator[os.DirEntry], list[os.DirEntry], str]
+    """Scan a single directory into an iterator of sorted sub-directories and sorted files."""
+    with os.scandir(path) as entries:
+        sorted_entries = sorted(entries, key=lambda e: e.name)
+    dirs = [entry for entry in sorted_entries if entry.is_dir()]
+    files = [entry for entry in sorted_entries if entry.is_file()]
+    return iter(dirs), files, prefix
@@ -12,18 +12,24 @@ MIrFlickr Dataset
     Info: https://press.liacs.nl/mirflickr/mirdownload.html
 
 """
-import shutil
+import pickle
 import threading
+import time
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cache, partial
 from pathlib import Path
-from typing import Generator
+from typing import Callable, Generator
 from zipfile import ZipInfo
 from loguru import logger as log
+from more_itertools import divide
 import httpx_cache as hc
 from remotezip import RemoteZip
+from requests import Session  # RemoteZip only accepts a requests session (not httpx)
+from requests.adapters import HTTPAdapter
 from rich.filesize import decimal
 from twinspect import check_dir_fast
+from twinspect.datasets.download import zip_member_data, zip_member_end, zip_runs
 from twinspect.globals import progress
 from twinspect.models import Dataset
 from twinspect.options import opts
@@ -32,10 +38,15 @@ from rich.progress import Progress, TaskID
 
 CLUSTERS = "http://www.mir-flickr-near-duplicates.appspot.com/truthFiles/IND_clusters.txt"
 DL_TPL = "https://press.liacs.nl/mirflickr/mirflickr1m.v3b/images{}.zip"
+INDEX_FILE = "mfnd-index.pkl"
+POOL_SIZE = 64
+PROGRESS_INTERVAL = 0.25
+ZIP_WORKERS = 4  # Concurrent range request readers per zip archive
 
 
+@cache
 def clusters() -> list[list[int]]:
-    """Download and parse MirFlickr image ids clustered by near duplicates."""
+    """Download and parse MirFlickr image ids clustered by near duplicates (once per process)."""
     with hc.Client(cache=hc.FileCache(), always_cache=True) as client:
         response = client.get(CLUSTERS)
 
@@ -58,9 +69,12 @@ def download_jobs(dataset):
         cluster: The local path to the cluster folder for storing the image file
     """
     log.debug(f"Collecting download jobs for {dataset.name}")
-    download_info = {i[0]: (i[1], i[2]) for i in image_ids()}
+    cluster_ids = clusters()
+    # Only keep zip infos of clustered images (a small fraction of the 1M images)
+    needed = {image_id for cluster in cluster_ids for image_id in cluster}
+    download_info = {i: (u, z) for i, u, z in image_ids() if i in needed}
     seen_clusters = set()
-    for cluster_id, cluster in enumerate(clusters()):
+    for cluster_id, cluster in enumerate(cluster_ids):
         cluster_path = dataset.data_folder / f"cluster_{int(cluster_id):05}"
         if cluster_path not in seen_clusters:
             cluster_path.mkdir(exist_ok=True, parents=True)
@@ -73,39 +87,112 @@ def download_jobs(dataset):
 def image_ids():
     # type: () -> Generator[tuple[str, str, ZipInfo]]
     """Yields image_id, zip_url, ZipInfo tuples for mapping image ids to inzip downloads paths."""
+    yield from image_index()
+
+
+@cache
+def image_index():
+    # type: () -> list[tuple[str, str, ZipInfo]]
+    """
+    Collect image_id, zip_url, ZipInfo tuples of all MirFlickr zip files.
+
+    The central directories of all zip files are fetched concurrently. The result is cached in
+    memory and as a pickle file in the root_folder keyed by the zip file URLs.
+
+    :return: List of image_id, zip_url, ZipInfo tuples in zip file order.
+    """
+    zip_urls = tuple(DL_TPL.format(zip_id) for zip_id in range(10))
+    cache_file = opts.root_folder / INDEX_FILE
+    if cache_file.exists():
+        try:
+            with cache_file.open("rb") as infile:
+                cached_urls, index = pickle.load(infile)
+            if cached_urls == zip_urls:
+                return index
+        except Exception as e:
+            log.warning(f"Ignoring broken index cache {cache_file.name} - {e}")
+
     log.debug("Collecting MirFlickr ZIP data")
-    for zip_id in range(10):
-        zip_url = DL_TPL.format(zip_id)
-        with RemoteZip(zip_url) as zfile:
-            for zinfo in zfile.infolist():
-                if zinfo.filename.endswith(".jpg"):
-                    image_id = Path(zinfo.filename).stem
-                    yield image_id, zip_url, zinfo
-
-
-def download_batch(zip_url, jobs, progress_, task_id, lock):
-    # type: (str, list[tuple], Progress, TaskID, threading.Lock) -> int
-    """Download a batch of image files and return number of processed files"""
+    with ThreadPoolExecutor(len(zip_urls)) as executor:
+        index = [item for items in executor.map(zip_images, zip_urls) for item in items]
+    with cache_file.open("wb") as outfile:
+        pickle.dump((zip_urls, index), outfile)
+    return index
+
+
+def zip_images(zip_url):
+    # type: (str) -> list[tuple[str, str, ZipInfo]]
+    """Return image_id, zip_url, ZipInfo tuples of all jpg files in a remote zip file."""
     with RemoteZip(zip_url) as zfile:
-        for zinfo, cluster_path in jobs:
+        return [
+            (Path(zinfo.filename).stem, zip_url, zinfo)
+            for zinfo in zfile.infolist()
+            if zinfo.filename.endswith(".jpg")
+        ]
+
+
+def remote_session():
+    # type: () -> Session
+    """Create a keep-alive HTTP session with a connection pool shared by all download workers."""
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def download_batch(zip_url, runs, targets, progress_, task_id, session, open_remote_zip):
+    # type: (str, list[list[ZipInfo]], dict, Progress, TaskID, Session, Callable) -> int
+    """
+    Download a batch of image files and return number of processed files.
+
+    Each run of nearby members is fetched with a single range request using the `ZipInfo` objects
+    from the image index, so the central directory of the zip file is not downloaded again.
+    Members that cannot be decoded from the fetched bytes fall back to the shared RemoteZip.
+
+    :param zip_url: The URL of the remote zip file.
+    :param runs: List of runs of ZipInfo objects to be downloaded (see `zip_runs`).
+    :param targets: Mapping of zip member filenames to lists of cluster folders to store them in.
+    :param progress_: The progress object to update the progress bar.
+    :param task_id: The task ID associated with the progress object.
+    :param session: The HTTP session to use for range requests.
+    :param open_remote_zip: Callable returning the shared RemoteZip for fallback extraction.
+    :return: The number of downloaded files.
+    """
+    # Progress is thread-safe, advance it at most every PROGRESS_INTERVAL seconds per batch
+    pending, last_update, counter = 0, time.monotonic(), 0
+    for run in runs:
+        start = run[0].header_offset
+        end = max(zip_member_end(zinfo) for zinfo in run)
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        try:
+            response = session.get(zip_url, headers=headers)
+            response.raise_for_status()
+            data = response.content if response.status_code == 206 else b""
+        except Exception as e:
+            log.warning(f"Range request failed for {zip_url} - {e}")
+            data = b""
+        for zinfo in run:
+            counter += 1
             try:
-                file_path = zfile.extract(zinfo.filename, cluster_path)
+                content = zip_member_data(data, start, zinfo) if data else None
+                if content is None:
+                    content = open_remote_zip().read(zinfo)
             except Exception as e:
                 log.error(f"Failed to retrieve {zinfo.filename} - {e}")
                 continue
-            src = Path(file_path)
-            dst = cluster_path
-            with lock:
-                # Move file, cleanup subfolders and update task
-                progress_.update(task_id, advance=zinfo.file_size, refresh=True)
-                try:
-                    shutil.move(src, dst)
-                    shutil.rmtree(src.parent.parent, ignore_errors=True)
-                except Exception as e:
-                    log.error(f"Failed move/cleanup {src} - {e}")
-                    continue
-            log.debug(f"Retrieved {Path(file_path).relative_to(opts.root_folder)}")
-    return len(jobs)
+            # Write member directly into the cluster folder (no nested zip path to move/cleanup)
+            for cluster_path in targets[zinfo.filename]:
+                file_path = cluster_path / Path(zinfo.filename).name
+                file_path.write_bytes(content)
+                log.debug(f"Retrieved {file_path.relative_to(opts.root_folder)}")
+            pending += zinfo.file_size
+            if time.monotonic() - last_update >= PROGRESS_INTERVAL:
+                progress_.update(task_id, advance=pending)
+                pending, last_update = 0, time.monotonic()
+    if pending:
+        progress_.update(task_id, advance=pending)
+    return counter
 
 
 def install(dataset):
@@ -123,19 +210,51 @@ def install(dataset):
     log.debug(f"Download {len(jobs)} mirflickr image files {human_size}")
 
     # Organize jobs by zip_url for parellel download
-    batches = defaultdict(list)
+    zip_members = defaultdict(dict)
+    targets = defaultdict(list)
     for url, zinfo, cluster_path in jobs:
-        batches[url].append((zinfo, cluster_path))
+        zip_members[url][zinfo.filename] = zinfo
+        targets[zinfo.filename].append(cluster_path)
+
+    # Coalesce members per zip into runs (in archive order) and split them for concurrent readers
+    batches = []
+    for zip_url, members in zip_members.items():
+        for batch in divide(ZIP_WORKERS, zip_runs(list(members.values()))):
+            batch = list(batch)
+            if batch:
+                batches.append((zip_url, batch))
 
     # Download/Extract image files in parallel
     with progress:
         task_id = progress.add_task("download", name="Remote Zip Extraction", total=total_size)
-        lock = threading.Lock()
-        with ThreadPoolExecutor() as executor:
+        workers = min(len(batches), POOL_SIZE) or 1
+        with ThreadPoolExecutor(workers) as executor, remote_session() as session:
+            # Fallback archives are opened at most once per zip file and shared by all workers
+            lock = threading.Lock()
+            remote_zips = {}
+
+            def open_remote_zip(zip_url):
+                # type: (str) -> RemoteZip
+                with lock:
+                    if zip_url not in remote_zips:
+                        remote_zips[zip_url] = RemoteZip(zip_url, session=session)
+                    return remote_zips[zip_url]
+
             futures = []
-            for zip_url, jobs in batches.items():
-                fut = executor.submit(download_batch, zip_url, jobs, progress, task_id, lock)
+            for zip_url, batch in batches:
+                fut = executor.submit(
+                    download_batch,
+                    zip_url,
+                    batch,
+                    targets,
+                    progress,
+                    task_id,
+                    session,
+                    partial(open_remote_zip, zip_url),
+                )
                 futures.append(fut)
             for future in as_completed(futures):
                 batch_size: int = future.result()
                 log.debug(f"Finished batch of {batch_size} files")
+            for remote_zip in remote_zips.values():
+                remote_zip.close()
@@ -2,7 +2,9 @@ import os
 import shutil
 from contextlib import contextmanager
 import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 from rich.progress import track
 from twinspect.globals import console
 
@@ -11,7 +13,9 @@ __all__ = [
     "random_seed",
     "Graph",
     "clusterize",
+    "copy_file",
     "iter_files",
+    "iter_file_entries",
 ]
 
 
@@ -33,58 +37,163 @@ def random_seed(seed):
 
 def iter_files(path: Path):
     """Iterate all files in path recurively with deterministic ordering"""
-    for root, dirs, files in os.walk(path, topdown=False):
-        dirs.sort()
-        files.sort()
-        for filename in files:
-            yield Path(os.path.join(root, filename))
+    for entry in iter_file_entries(path):
+        yield Path(entry.path)
+
+
+def iter_file_entries(path):
+    # type: (str|Path) -> Iterator[os.DirEntry]
+    """
+    Iterate `os.DirEntry` objects of all files in path recursively with deterministic ordering.
+
+    The ordering is the same as `os.walk(path, topdown=False)`: files of sub-directories (in
+    directory order) before the sorted files of a folder. Yielding entries lets callers reuse the
+    cached directory entry info instead of constructing `Path` objects.
+    """
+    stack = [_scan_files(os.fspath(path))]
+    while stack:
+        files, sub_dirs = stack[-1]
+        sub_dir = next(sub_dirs, None)
+        if sub_dir is not None:
+            stack.append(_scan_files(sub_dir))
+            continue
+        stack.pop()
+        yield from files
+
+
+def _scan_files(path):
+    # type: (str) -> tuple[list[os.DirEntry], Iterator[str]]
+    """Return file entries sorted by path and an iterator of sub-directory paths (not symlinks)."""
+    files, sub_dirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry)
+                elif not entry.is_symlink():
+                    sub_dirs.append(entry.path)
+    except OSError:
+        pass  # Unreadable folders are skipped like in os.walk
+    files.sort(key=lambda e: e.path)
+    return files, iter(sub_dirs)
 
 
 def clusterize(src: Path, dst: Path, clusters: int):
     """Copy files from source to destination into a cluster folder structure."""
-    clustered = 0
-    files = [fp for fp in iter_files(src) if fp.is_file()]
-    for path in track(files, description=f"Clusterizing {dst.name}", console=console):
+    files = list(iter_files(src))  # scandir already separates files using cached entry types
+
+    # Assign targets in file order (later files with the same target name win as before)
+    jobs = {}
+    for clustered, path in enumerate(files):
         if clustered < clusters:
-            cluster_folder_name = f"{clustered:07d}"
-            target_dir = dst / cluster_folder_name
+            target_dir = dst / f"{clustered:07d}"
             target_dir.mkdir(parents=True)
-            target_file = target_dir / f"0{path.name}"
-            shutil.copy(path, target_file)
-            # log.trace(f"{path.name} -> {cluster_folder_name}/{target_file.name}")
-            clustered += 1
+            jobs[target_dir / f"0{path.name}"] = path
         else:
-            shutil.copy(path, dst)
+            jobs[dst / path.name] = path
+
+    # Copy concurrently, the kernel overlaps IO of independent files
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(workers) as executor:
+        copies = executor.map(copy_file, jobs.values(), jobs.keys())
+        for _ in track(
+            copies, total=len(jobs), description=f"Clusterizing {dst.name}", console=console
+        ):
+            pass
+
+
+def copy_file(src, dst):
+    # type: (str|Path, str|Path) -> None
+    """
+    Copy file content from `src` to the file path `dst`.
+
+    Uses in-kernel `os.copy_file_range` where available (Linux), which avoids user-space buffers
+    and allows reflink copies on filesystems that support them. Falls back to `shutil.copyfile`.
+
+    :param src: Source file path.
+    :param dst: Destination file path (not a directory).
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as infile, open(dst, "wb") as outfile:
+                remaining = os.fstat(infile.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(infile.fileno(), outfile.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            return
+        except OSError:
+            pass  # Unsupported by filesystem or kernel
+    shutil.copyfile(src, dst)
+
+
+class DSU:
+    """
+    Disjoint set union (union-find) with union by rank and path compression.
+    """
+
+    def __init__(self):
+        self.parent = {}  # type: dict[str, str]
+        self.rank = {}  # type: dict[str, int]
+
+    def add(self, x):
+        # type: (str) -> None
+        """Add `x` as a singleton set if it is not yet known."""
+        if x not in self.parent:
+            self.parent[x] = x
+            self.rank[x] = 0
+
+    def find(self, x):
+        # type: (str) -> str
+        """Return the representative of the set containing `x`."""
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Compress path
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        # type: (str, str) -> None
+        """Merge the sets containing `a` and `b`."""
+        self.add(a)
+        self.add(b)
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+
+    def components(self):
+        # type: () -> list[set]
+        """Return all sets ordered by the insertion order of their first member."""
+        components = {}
+        for x in self.parent:
+            components.setdefault(self.find(x), set()).add(x)
+        return list(components.values())
 
 
 class Graph:
+    """Undirected graph for connected components (backed by `DSU`)."""
+
     def __init__(self):
-        self.adj_list = {}
+        self.dsu = DSU()
 
     def add_edge(self, a, b):
-        if a not in self.adj_list:
-            self.adj_list[a] = set()
-        self.adj_list[a].add(b)
-
-        if b not in self.adj_list:
-            self.adj_list[b] = set()
-        self.adj_list[b].add(a)
+        # type: (str, str) -> None
+        """Connect nodes `a` and `b`."""
+        self.dsu.union(a, b)
 
     def connected_components(self):
-        visited = set()
-        components = []
-
-        for node in self.adj_list:
-            if node not in visited:
-                component = set()
-                self._dfs(node, visited, component)
-                components.append(component)
-
-        return components
-
-    def _dfs(self, node, visited, component):
-        visited.add(node)
-        component.add(node)
-        for neighbor in self.adj_list[node]:
-            if neighbor not in visited:
-                self._dfs(neighbor, visited, component)
+        # type: () -> list[set]
+        """Return the node sets of all connected components."""
+        return self.dsu.components()
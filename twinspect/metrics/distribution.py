@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 from loguru import logger as log
@@ -7,7 +6,7 @@ from pathlib import Path
 from rich.progress import Progress
 from twinspect.globals import console
 from twinspect.tools import result_path
-from twinspect.metrics.utils import update_json, get_metric, load_csv
+from twinspect.metrics.utils import update_json, get_metric, load_csv, hamming_matrix
 
 
 def distribution(simprint_path, chunk_size=100):
@@ -25,21 +24,21 @@ def distribution(simprint_path, chunk_size=100):
         do_update = True
         simprints = load_csv(simprint_path)
         num_simprints = len(simprints)
-        counter = Counter()
+        # Hamming distances range from 0 to the number of bits per code
+        num_bins = simprints.shape[1] * 8 + 1
+        histogram = np.zeros(num_bins, dtype=np.int64)
         with Progress(console=console) as progress:
             task = progress.add_task("[cyan]Compute Distribution", total=num_simprints)
-            # Compute hamming distances in chunks
+            # Compute hamming distance histograms in chunks (NumPy releases the GIL)
             with ThreadPoolExecutor() as executor:
                 futures = {
-                    executor.submit(calculate_chunk, simprints, i, chunk_size)
+                    executor.submit(calculate_histogram, simprints, i, chunk_size, num_bins)
                     for i in range(0, num_simprints, chunk_size)
                 }
                 for future in as_completed(futures):
-                    chunk = future.result()
-                    # Update the counter
-                    counter.update(chunk.flatten())
+                    histogram += future.result()
                     progress.update(task, advance=chunk_size)
-        result = {int(k): int(v) for k, v in sorted(counter.items())}
+        result = {k: int(v) for k, v in enumerate(histogram) if v}
 
     # Store evaluation results
     metrics_path = result_path(algo, dataset, "json", tag="metrics")
@@ -58,4 +57,11 @@ def distribution(simprint_path, chunk_size=100):
 
 def calculate_chunk(simprints, i, chunk_size):
     """Helper function to calculate a chunk of Hamming distances"""
-    return np.unpackbits(simprints[i : i + chunk_size, None] ^ simprints, axis=2).sum(axis=2)
+    # Popcount on the XOR of packed codes (no 8x bit expansion via unpackbits)
+    return hamming_matrix(simprints[i : i + chunk_size], simprints)
+
+
+def calculate_histogram(simprints, i, chunk_size, num_bins):
+    """Helper function to count the Hamming distances of a chunk"""
+    # Only the small histogram leaves the worker, the distance matrix is freed right away
+    return np.bincount(calculate_chunk(simprints, i, chunk_size).ravel(), minlength=num_bins)
@@ -78,14 +78,18 @@ Implementation Notes:
     f1-scores per query at thresholds 0 to max_trhreshold.
 """
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from hexhamming import hamming_distance_string as hamming_distance
 from twinspect.metrics.hamming import HammingHero
 from twinspect.tools import result_path
 from twinspect.metrics.utils import update_json, best_threshold, get_metric
+from twinspect.metrics.utils import decode_codes, hamming_matrix
 from loguru import logger as log
 
 
+FILE_PATTERN = r"^(?:(?=(?P<cluster>[^/]*)/))?(?:.*_(?P<transform>[^._]*))?"
+
+
 def effectiveness(simprint_path):
     # type: (str|Path) -> dict
     """Compute precission, recall and f1-score for simprint csv file"""
@@ -152,20 +156,11 @@ def load_simprints(simprint_path):
         dtype={"id": int, "code": str, "file": str, "size": int, "time": int},
     )
 
-    # Extract cluster information
-    simprints["cluster"] = (
-        simprints["file"].str.split("/").str[0].where(simprints["file"].str.contains("/"), None)
-    )
-
-    # Extract transformation information
-    simprints["transform"] = (
-        simprints["file"]
-        .str.split("_")
-        .str[-1]
-        .str.split(".")
-        .str[0]
-        .where(simprints["file"].str.contains("_"), None)
-    )
+    # Extract cluster (first path segment) and transformation (after last underscore up to the
+    # first dot) information in a single regex pass over the file column
+    parts = simprints["file"].str.extract(FILE_PATTERN)
+    simprints["cluster"] = parts["cluster"]
+    simprints["transform"] = parts["transform"]
 
     # Initialize the is_original column with False values
     simprints["is_original"] = False
@@ -191,17 +186,23 @@ def ground_truth(df):
     hamming_distance. Top levels files without cluster of clusters with only one file have an
     empty result list.
     """
-    df["ground_truth"] = df.apply(
-        lambda x: [
-            (hamming_distance(x["code"], y["code"]), y["id"])
-            for _, y in df[df["cluster"] == x["cluster"]].iterrows()
-            if y["id"] != x["id"]
-        ]
-        if pd.notna(x["cluster"])
-        else [],
-        axis=1,
-    )
-    df["ground_truth"] = df["ground_truth"].apply(lambda x: sorted(x, key=lambda y: y[0]))
+    ids = df["id"].to_numpy()
+    codes = df["code"].to_numpy()
+    ground_truths = [[] for _ in range(len(df))]
+    # Compute intra-cluster distances per cluster (rows without cluster are not grouped)
+    for positions in df.groupby("cluster", sort=False).indices.values():
+        cluster_codes = decode_codes(list(codes[positions]))
+        distances = hamming_matrix(cluster_codes, cluster_codes)
+        cluster_ids = ids[positions]
+        for row, position in enumerate(positions):
+            # Stable sort keeps file order for equal distances
+            order = np.argsort(distances[row], kind="stable")
+            ground_truths[position] = [
+                (int(distances[row, j]), int(cluster_ids[j]))
+                for j in order
+                if cluster_ids[j] != ids[position]
+            ]
+    df["ground_truth"] = ground_truths
     return df[["id", "ground_truth"]]
 
 
@@ -210,26 +211,29 @@ def evaluate(df_ground_truth, df_query_result, max_threshold):
 
     result = []
 
-    total_files = len(df)
+    # Flatten ground truth and query results into (row, file_id) keys
+    gt_rows, gt_ids = flatten_results(df["ground_truth"])
+    qr_rows, qr_ids, qr_dists = flatten_results(df["query_result"], with_distance=True)
+    stride = max(gt_ids.max(initial=0), qr_ids.max(initial=0)) + 2
+    gt_keys = np.unique(gt_rows * stride + gt_ids + 1)
+
+    # A file enters a query result set at its lowest distance within the threshold range
+    keep = qr_dists <= max_threshold
+    qr_keys, qr_dists = qr_rows[keep] * stride + qr_ids[keep] + 1, qr_dists[keep]
+    order = np.lexsort((qr_dists, qr_keys))
+    qr_keys, first = np.unique(qr_keys[order], return_index=True)
+    qr_dists = qr_dists[order][first]
+    relevant = np.isin(qr_keys, gt_keys, assume_unique=True)
+
+    # Result sets grow with the threshold so counts are cumulative over distances
+    num_bins = max_threshold + 1
+    tps = np.cumsum(np.bincount(qr_dists[relevant], minlength=num_bins))
+    fps = np.cumsum(np.bincount(qr_dists[~relevant], minlength=num_bins))
 
     for threshold in range(max_threshold + 1):
-        tp = 0
-        fp = 0
-        fn = 0
-        tn = 0
-
-        for _, row in df.iterrows():
-            ground_truth_ = set(file_id for _, file_id in row["ground_truth"])
-            query_result = set(
-                file_id
-                for hamming_distance_, file_id in row["query_result"]
-                if hamming_distance_ <= threshold
-            )
-
-            tp += len(ground_truth_.intersection(query_result))
-            fp += len(query_result.difference(ground_truth_))
-            fn += len(ground_truth_.difference(query_result))
-            tn += total_files - len(ground_truth_.union(query_result))
+        tp = int(tps[threshold])
+        fp = int(fps[threshold])
+        fn = len(gt_keys) - tp
 
         precision = tp / (tp + fp) if (tp + fp) > 0 else 0
         recall = tp / (tp + fn) if (tp + fn) > 0 else 0
@@ -244,3 +248,21 @@ def evaluate(df_ground_truth, df_query_result, max_threshold):
         )
 
     return result
+
+
+def flatten_results(results, with_distance=False):
+    # type: (pd.Series, bool) -> tuple[np.ndarray, ...]
+    """
+    Flatten a series of (hamming_distance, file_id) result lists into flat numpy arrays.
+
+    :param results: Series of lists with (hamming_distance, file_id) tuples.
+    :param with_distance: Also return the hamming distances.
+    :return: Arrays of row positions and file ids (and hamming distances).
+    """
+    lengths = results.map(len).to_numpy()
+    pairs = np.array([pair for result in results for pair in result], dtype=np.int64)
+    pairs = pairs.reshape(-1, 2)
+    rows = np.repeat(np.arange(len(results)), lengths)
+    if with_distance:
+        return rows, pairs[:, 1], pairs[:, 0]
+    return rows, pairs[:, 1]
@@ -3,23 +3,40 @@ The TwinSpect Benchmark requires an all-pairs hamming distance search which unfo
 does not scale for larger datasets above a couple of thousand items O(n^2). So instead we use a
 less accurate but much more performant Approximate Nearest Neighbor Search (ANNS) based on the
 faiss library.
+
+For small datasets building the ANNS index costs more than an exact search, so below
+`EXACT_SEARCH_LIMIT` codes we run an exact vectorized all-pairs search instead. Above
+`IVF_LIMIT` codes we switch from an HNSW to an IVF index which trains and builds faster.
 """
-import csv
 from typing import Iterable
 from numpy.typing import NDArray
 import numpy as np
 import pandas as pd
 from loguru import logger as log
 from pathlib import Path
-from faiss import IndexBinaryHNSW, read_index_binary, write_index_binary
+from faiss import (
+    IndexBinaryFlat,
+    IndexBinaryHNSW,
+    IndexBinaryIVF,
+    IO_FLAG_MMAP,
+    IO_FLAG_READ_ONLY,
+    read_index_binary,
+    write_index_binary,
+)
 from rich.progress import track
 from twinspect.globals import console
+from twinspect.metrics.utils import hamming_matrix
 from collections import Counter
 
 
 __all__ = ["HammingHero", "LameDuck"]
 
 
+EXACT_SEARCH_LIMIT = 5000
+IVF_LIMIT = 50_000
+CSV_CHUNK_SIZE = 8192
+
+
 class BaseHammingSearch:
     def _load_csv(self):
         # type: () -> NDArray[np.uint8]
@@ -28,18 +45,24 @@ class BaseHammingSearch:
 
         :return: 2-dimensional numpy array of binary codes.
         """
-        # Load codes from csv to numpy array
+        # Stream codes from csv and decode them chunk by chunk in single C-level passes
         log.debug(f"Loading codes from {self.csv_path.name}")
-        with self.csv_path.open("r") as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=";")
-            hex_codes = [row[self.code_field] for row in reader]
+        chunks = []
+        with pd.read_csv(
+            self.csv_path,
+            sep=";",
+            usecols=[self.code_field],
+            dtype=str,
+            engine="c",
+            chunksize=CSV_CHUNK_SIZE,
+        ) as reader:
+            for df in reader:
+                hex_codes = df[self.code_field].tolist()
+                flat = bytes.fromhex("".join(hex_codes))
+                chunks.append(np.frombuffer(flat, dtype=np.uint8).reshape(len(hex_codes), -1))
 
-        num_codes = len(hex_codes)
-        code_length = len(hex_codes[0]) // 2
-        uint8_matrix = np.empty((num_codes, code_length), dtype=np.uint8)
-        for i, hex_code in enumerate(hex_codes):
-            for j in range(0, len(hex_code), 2):
-                uint8_matrix[i, j // 2] = np.uint8(int(hex_code[j : j + 2], 16))
+        # Concatenate to a writable contiguous buffer as required by faiss
+        uint8_matrix = np.concatenate(chunks)
 
         self.numpy_codes = uint8_matrix
         return uint8_matrix
@@ -86,35 +109,27 @@ class LameDuck(BaseHammingSearch):
         df = pd.DataFrame({"id": range(len(query_results)), "query_result": query_results})
         return df
 
-    def iter_queries(self, threshold):
-        # type: (int) -> Iterable[NDArray[np.uint8]]
+    def iter_queries(self, threshold, batch_size=1024):
+        # type: (int, int) -> Iterable[NDArray[np.uint8]]
         """
         Iterate over all pairs query results with hamming `threshold`.
 
-        :param threshold: Hamming distance threshold for the search.
-        """
-        for i, code in enumerate(self.numpy_codes):
-            query_result = []
-            for j, other_code in enumerate(self.numpy_codes):
-                if i != j:
-                    distance = self.hamming_distance(code, other_code)
-                    self.distribution.update([distance])
-                    if distance <= threshold:
-                        query_result.append((distance, j))
-            query_result.sort()
-            yield query_result
-
-    @staticmethod
-    def hamming_distance(code1, code2):
-        # type: (NDArray[np.uint8], NDArray[np.uint8]) -> int
-        """
-        Calculate the Hamming distance between two binary codes.
+        Distances are computed for a batch of queries against all codes at once and counted into
+        the all-pairs `distribution` (excluding self-matches).
 
-        :param code1: Binary code 1.
-        :param code2: Binary code 2.
-        :return: Hamming distance.
+        :param threshold: Hamming distance threshold for the search.
+        :param batch_size: Number of codes to compare against all codes per step.
         """
-        return int(np.sum(np.unpackbits(code1 ^ code2)))
+        num_codes = len(self.numpy_codes)
+        for start in range(0, num_codes, batch_size):
+            distances = hamming_matrix(
+                self.numpy_codes[start : start + batch_size], self.numpy_codes
+            )
+            histogram = np.bincount(distances.ravel())
+            histogram[0] -= len(distances)  # Self-matches
+            self.distribution.update({k: int(v) for k, v in enumerate(histogram) if v})
+            for row, row_distances in enumerate(distances):
+                yield threshold_results(row_distances, start + row, threshold)
 
 
 class HammingHero(BaseHammingSearch):
@@ -135,12 +150,13 @@ class HammingHero(BaseHammingSearch):
         self.csv_path = c
         self.code_field = code_field
         self.index_file = c.parent / f"{c.stem}.anns"
-        self.index: IndexBinaryHNSW | None = None
+        self.index: IndexBinaryHNSW | IndexBinaryIVF | None = None
         self.numpy_codes: NDArray[np.uint8] | None = None
+        self.exact = False
         self._load()
 
-    def compute_queries(self, threshold, nprobe=10):
-        # type: (int, int) -> pd.DataFrame
+    def compute_queries(self, threshold, nprobe=10, batch_size=1024):
+        # type: (int, int, int) -> pd.DataFrame
         """
         Collect query results into a DataFrame of the form:
 
@@ -150,32 +166,58 @@ class HammingHero(BaseHammingSearch):
 
         :param threshold: Hamming distance threshold for the search.
         :param nprobe: Number of probes to use during the search.
+        :param batch_size: Number of codes to query per index search call.
         :return: DataFrame with ids and query results
         """
-        query_results = list(self.iter_queries(threshold, nprobe))
+        query_results = list(self.iter_queries(threshold, nprobe, batch_size))
         df = pd.DataFrame({"id": range(len(query_results)), "query_result": query_results})
         return df
 
-    def iter_queries(self, threshold, nprobe=10):
-        # type: (int, int) -> Iterable[NDArray[np.uint8]]
+    def iter_queries(self, threshold, nprobe=10, batch_size=1024):
+        # type: (int, int, int) -> Iterable[NDArray[np.uint8]]
         """
         Iterate over all pairs query results with hamming `threshold`.
 
+        Queries are sent to the index in batches to amortize the per-call overhead of faiss.
+
         :param threshold: Hamming distance threshold for the search.
         :param nprobe: Number of probes to use during the search.
+        :param batch_size: Number of codes to query per index search call.
         """
-        index: IndexBinaryHNSW = self.index
+        if self.exact:
+            yield from self.iter_queries_exact(threshold, batch_size)
+            return
+        index: IndexBinaryHNSW | IndexBinaryIVF = self.index
         index.nprobe = nprobe
-        for i, code in enumerate(self.numpy_codes):
-            query_code = np.expand_dims(code, axis=0)
-            distances, indices = index.search(query_code, threshold)
-            query_result = [
-                (dist, idx)
-                for dist, idx in zip(distances[0], indices[0])
-                if dist <= threshold and idx != i
-            ]
-            query_result.sort()
-            yield query_result
+        num_codes = len(self.numpy_codes)
+        for start in range(0, num_codes, batch_size):
+            query_codes = self.numpy_codes[start : start + batch_size]
+            distances, indices = index.search(query_codes, threshold)
+            for row in range(len(query_codes)):
+                i = start + row
+                query_result = [
+                    (dist, idx)
+                    for dist, idx in zip(distances[row], indices[row])
+                    if dist <= threshold and idx != i
+                ]
+                query_result.sort()
+                yield query_result
+
+    def iter_queries_exact(self, threshold, batch_size=1024):
+        # type: (int, int) -> Iterable[NDArray[np.uint8]]
+        """
+        Iterate over exact all pairs query results with hamming `threshold` without an index.
+
+        :param threshold: Hamming distance threshold for the search.
+        :param batch_size: Number of codes to compare against all codes per step.
+        """
+        num_codes = len(self.numpy_codes)
+        for start in range(0, num_codes, batch_size):
+            distances = hamming_matrix(
+                self.numpy_codes[start : start + batch_size], self.numpy_codes
+            )
+            for row, row_distances in enumerate(distances):
+                yield threshold_results(row_distances, start + row, threshold)
 
     def _load(self):
         # type: () -> None
@@ -185,23 +227,62 @@ class HammingHero(BaseHammingSearch):
         # Load query codes from CSV
         self._load_csv()
 
-        # Load existing index
-        if self.index_file.exists():
-            log.debug(f"Load HNSW index {self.index_file.name}")
-            self.index = read_index_binary(self.index_file.as_posix())
+        # Skip index for small datasets
+        if len(self.numpy_codes) < EXACT_SEARCH_LIMIT:
+            log.debug(f"Using exact search for {len(self.numpy_codes)} codes")
+            self.exact = True
             return
 
-        # Build & Store  FAISS Binary HNSW index
-        log.debug(f"Build HNSW index {self.index_file.name}")
+        # Load existing index unless it is older than the CSV file it was built from
+        if self.index_file.exists() and not self._index_outdated():
+            log.debug(f"Load ANNS index {self.index_file.name}")
+            flags = IO_FLAG_MMAP | IO_FLAG_READ_ONLY
+            self.index = read_index_binary(self.index_file.as_posix(), flags)
+            return
+
+        # Build & Store FAISS Binary HNSW index (IVF index for large datasets)
+        num_codes = len(self.numpy_codes)
         bit_length = len(self.numpy_codes[0]) * 8
-        self.index = IndexBinaryHNSW(bit_length)
-        self.index.train(self.numpy_codes)
+        if num_codes > IVF_LIMIT:
+            nlist = int(np.sqrt(num_codes))
+            log.debug(f"Build IVF index {self.index_file.name} with {nlist} lists")
+            self.index = IndexBinaryIVF(IndexBinaryFlat(bit_length), bit_length, nlist)
+        else:
+            log.debug(f"Build HNSW index {self.index_file.name}")
+            self.index = IndexBinaryHNSW(bit_length)
+        if not self.index.is_trained:
+            self.index.train(self.numpy_codes)
         self.index.add(self.numpy_codes)
         self._save()
 
+    def _index_outdated(self):
+        # type: () -> bool
+        """
+        Check if the index file was built before the CSV file was (re)written.
+        """
+        return self.index_file.stat().st_mtime_ns < self.csv_path.stat().st_mtime_ns
+
     def _save(self):
         # type: () -> None
         """
         Save index to disk.
         """
         write_index_binary(self.index, self.index_file.as_posix())
+
+
+def threshold_results(row_distances, i, threshold):
+    # type: (NDArray[np.uint16], int, int) -> list[tuple[int, int]]
+    """
+    Collect sorted (distance, id) query results from a row of all-pairs hamming distances.
+
+    :param row_distances: Hamming distances of query `i` to all codes.
+    :param i: Id of the query code (excluded from results).
+    :param threshold: Hamming distance threshold for the search.
+    :return: List of (distance, id) tuples sorted by distance and id.
+    """
+    mask = row_distances <= threshold
+    mask[i] = False
+    (matches,) = np.nonzero(mask)
+    distances = row_distances[matches]
+    order = np.lexsort((matches, distances))
+    return list(zip(distances[order].tolist(), matches[order].tolist()))
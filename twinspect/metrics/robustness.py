@@ -1,9 +1,9 @@
 from pathlib import Path
 from twinspect.metrics.eff import load_simprints
-from hexhamming import hamming_distance_string as hamming_distance
+import numpy as np
 import pandas as pd
 from twinspect.tools import result_path
-from twinspect.metrics.utils import update_json, get_metric
+from twinspect.metrics.utils import update_json, get_metric, decode_codes, hamming_matrix
 from loguru import logger as log
 
 
@@ -40,22 +40,31 @@ def robustness(simprint_path):
         log.debug(f"Compute [white on red]robustness[/] metric for {algo} -> {dataset}")
         do_update = True
         df_simprints = load_simprints(simprint_path)
-        # Filter out the original files and group by cluster
-        originals = df_simprints[df_simprints["is_original"]]
-        grouped_transforms = df_simprints[~df_simprints["is_original"]].groupby("cluster")
+        codes = decode_codes(df_simprints["code"].tolist())
+        transforms = df_simprints["transform"].to_numpy()
+        # Positions of original files and of transformed files grouped by cluster
+        is_original = df_simprints["is_original"].to_numpy()
+        original_positions = np.flatnonzero(is_original)
+        transformed_positions = np.flatnonzero(~is_original)
+        transformed_groups = df_simprints[~is_original].groupby("cluster").indices
 
-        # Calculate hamming distances
-        distances = []
-
-        for _, original in originals.iterrows():
-            cluster = original["cluster"]
-            transformed_files = grouped_transforms.get_group(cluster)
-            for _, transformed in transformed_files.iterrows():
-                distance = hamming_distance(original["code"], transformed["code"])
-                distances.append({"transform": transformed["transform"], "distance": distance})
+        # Calculate hamming distances of each original to all transformed files in its cluster
+        distance_transforms, distance_values = [], []
+        for position in original_positions:
+            cluster_positions = transformed_positions[
+                transformed_groups[df_simprints["cluster"].iat[position]]
+            ]
+            distances = hamming_matrix(codes[position : position + 1], codes[cluster_positions])
+            distance_transforms.append(transforms[cluster_positions])
+            distance_values.append(distances[0])
 
         # Calculate min, max, mean, median distances per transformation
-        df_distances = pd.DataFrame(distances)
+        df_distances = pd.DataFrame(
+            {
+                "transform": np.concatenate(distance_transforms),
+                "distance": np.concatenate(distance_values).astype(np.int64),
+            }
+        )
         grouped_distances = df_distances.groupby("transform")
         stats = grouped_distances["distance"].agg(["min", "max", "mean", "median"]).reset_index()
 
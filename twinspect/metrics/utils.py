@@ -1,31 +1,89 @@
-import csv
 import json
 from pathlib import Path
 from typing import Dict, Any
 import jmespath
 import numpy as np
+import pandas as pd
 from numpy.typing import NDArray
 from loguru import logger as log
 
 
+POPCOUNT_LUT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+SWAR_MASKS = np.array(
+    [0x5555555555555555, 0x3333333333333333, 0x0F0F0F0F0F0F0F0F, 0x0101010101010101],
+    dtype=np.uint64,
+)
+SWAR_SHIFTS = np.array([1, 2, 4, 56], dtype=np.uint64)
+
+
 def load_csv(simprint_path, code_field="code"):
     # type: (str|Path, str) -> NDArray[np.uint8]
     """Load simprints to numpy uint8 matrix"""
     simprint_path = Path(simprint_path)
     log.debug(f"Loading codes from {simprint_path.name}")
-    with simprint_path.open("r") as csvfile:
-        reader = csv.DictReader(csvfile, delimiter=";")
-        hex_codes = [row[code_field] for row in reader]
-    num_codes = len(hex_codes)
-    code_length = len(hex_codes[0]) // 2
-    uint8_matrix = np.empty((num_codes, code_length), dtype=np.uint8)
-    for i, hex_code in enumerate(hex_codes):
-        for j in range(0, len(hex_code), 2):
-            uint8_matrix[i, j // 2] = np.uint8(int(hex_code[j : j + 2], 16))
+    hex_codes = pd.read_csv(simprint_path, sep=";", usecols=[code_field], dtype=str)[code_field]
+    uint8_matrix = decode_codes(hex_codes.tolist())
     log.debug(f"Loaded {len(uint8_matrix)} simprints to numpy")
     return uint8_matrix
 
 
+def decode_codes(hex_codes):
+    # type: (list[str]) -> NDArray[np.uint8]
+    """
+    Decode hex coded compact binary codes of equal length into a uint8 matrix.
+
+    :param hex_codes: List of hex coded binary codes.
+    :return: Writable 2-dimensional uint8 matrix with one row per code.
+    """
+    flat = bytearray.fromhex("".join(hex_codes))
+    return np.frombuffer(flat, dtype=np.uint8).reshape(len(hex_codes), -1)
+
+
+def hamming_matrix(codes_a, codes_b):
+    # type: (NDArray[np.uint8], NDArray[np.uint8]) -> NDArray[np.uint16]
+    """
+    Compute the matrix of hamming distances between two sets of binary codes.
+
+    Codes with a length divisible by 8 bytes are compared as 64-bit words with `np.bitwise_count`
+    (NumPy >= 2.0) or a SWAR popcount. Other codes fall back to a byte-wise popcount lookup table.
+    Distances are accumulated one word (or byte) column at a time, so temporaries stay at the
+    size of the result matrix instead of growing with the code length.
+
+    :param codes_a: 2-dimensional uint8 matrix of binary codes.
+    :param codes_b: 2-dimensional uint8 matrix of binary codes with the same code length.
+    :return: Matrix of shape (len(codes_a), len(codes_b)) with hamming distances.
+    """
+    distances = np.zeros((len(codes_a), len(codes_b)), dtype=np.uint16)
+    if codes_a.shape[1] % 8 == 0:
+        # Transposed word columns are contiguous for the per column outer XOR
+        words_a = np.ascontiguousarray(codes_a).view(np.uint64).T.copy()
+        words_b = np.ascontiguousarray(codes_b).view(np.uint64).T.copy()
+        for col_a, col_b in zip(words_a, words_b):
+            distances += popcount64(np.bitwise_xor.outer(col_a, col_b))
+        return distances
+    for col_a, col_b in zip(codes_a.T.copy(), codes_b.T.copy()):
+        distances += POPCOUNT_LUT[np.bitwise_xor.outer(col_a, col_b)]
+    return distances
+
+
+def popcount64(words):
+    # type: (NDArray[np.uint64]) -> NDArray[np.uint8]
+    """
+    Count the set bits of each 64-bit word.
+
+    :param words: Array of uint64 words (modified in place by the SWAR fallback).
+    :return: Array of the same shape with the number of set bits per word.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    words -= (words >> SWAR_SHIFTS[0]) & SWAR_MASKS[0]
+    words = (words & SWAR_MASKS[1]) + ((words >> SWAR_SHIFTS[1]) & SWAR_MASKS[1])
+    words = (words + (words >> SWAR_SHIFTS[2])) & SWAR_MASKS[2]
+    words *= SWAR_MASKS[3]
+    words >>= SWAR_SHIFTS[3]
+    return words.astype(np.uint8)
+
+
 def get_metric(metrics_path, metric):
     # type: (str|Path, str) -> dict|None
     """Return a given metric from metrics file path."""
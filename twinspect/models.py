@@ -39,11 +39,11 @@ class Benchmark(BenchmarkBase):
                 metrics.append(metric)
         return metrics
 
-    def simprint(self) -> Path:
+    def simprint(self, force=False) -> Path:
         """Compute simprint file for benchmark"""
         import twinspect as ts
 
-        return ts.simprint(self)
+        return ts.simprint(self, force=force)
 
     def filepath(self, extension, tag=None):
         # type: (str, str|None) -> Path
@@ -134,7 +134,9 @@ class Dataset(DatasetBase):
         import twinspect as ts
 
         func = ts.load_function(self.installer)
-        return func(dataset=self)
+        data_folder = func(dataset=self)
+        ts.clear_folder_checksums()
+        return data_folder
 
 
 class Configuration(BaseModel):
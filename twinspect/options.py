@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
 """Framework Evironment options"""
+import os
+import pickle
 import yaml
+from blake3 import blake3
+from loguru import logger as log
 from pydantic import BaseSettings, Field, DirectoryPath, FilePath, validator
 import twinspect as ts
 from pathlib import Path
 
 
-__all__ = ["opts", "cnf"]
+__all__ = ["opts", "cnf", "load_config"]
+
+
+MODEL_FILES = ("models.py", "schema.py")  # Modules defining the pickled configuration classes
 
 
 class TwinSpectSettings(BaseSettings):
@@ -31,5 +38,60 @@ class TwinSpectSettings(BaseSettings):
         return path
 
 
+def load_config(config_file, cache_folder=None):
+    # type: (str|Path, str|Path|None) -> ts.Configuration
+    """
+    Load benchmark configuration with a pickle cache keyed by file modification time.
+
+    The cache is invalidated if the configuration file, the TwinSpect version or the source of the
+    configuration model classes changes.
+
+    :param config_file: Path to the YAML benchmark configuration file.
+    :param cache_folder: Folder for storing the parsed configuration cache. Default: root_folder.
+    :return: Parsed and validated benchmark configuration
+    """
+    config_file = Path(config_file).resolve()
+    cache_folder = Path(cache_folder or opts.root_folder)
+    cache_file = cache_folder / f"{config_file.name}.pkl"
+    header = (
+        config_file.as_posix(),
+        config_file.stat().st_mtime_ns,
+        ts.__version__,
+        model_digest(),
+    )
+
+    if cache_file.exists():
+        try:
+            with cache_file.open("rb") as infile:
+                cached_header, config = pickle.load(infile)
+            if cached_header == header:
+                return config
+        except Exception as e:
+            log.warning(f"Ignoring broken configuration cache {cache_file.name} - {e}")
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with config_file.open("rt", encoding="utf-8") as infile:
+        config = ts.Configuration.parse_obj(yaml.load(infile, Loader=loader))
+    # Atomically replace the cache, a failed write only costs reparsing on the next import
+    tmp_file = cache_file.with_suffix(".tmp")
+    try:
+        with tmp_file.open("wb") as outfile:
+            pickle.dump((header, config), outfile)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        log.warning(f"Failed to write configuration cache {cache_file.name} - {e}")
+        tmp_file.unlink(missing_ok=True)
+    return config
+
+
+def model_digest():
+    # type: () -> str
+    """Return a digest of the source of the modules defining the configuration classes."""
+    hasher = blake3()
+    for name in MODEL_FILES:
+        hasher.update((Path(__file__).parent / name).read_bytes())
+    return hasher.hexdigest(8)
+
+
 opts = TwinSpectSettings()
-cnf = ts.Configuration.parse_obj(yaml.safe_load(open(opts.config_file)))
+cnf = load_config(opts.config_file)
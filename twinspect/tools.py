@@ -16,6 +16,8 @@ import twinspect as ts
 
 __all__ = [
     "result_path",
+    "folder_checksum",
+    "clear_folder_checksums",
     "get_data_folder",
     "get_function",
     "load_function",
@@ -27,7 +29,6 @@ __all__ = [
 ]
 
 
-@cache
 def result_path(algo_label, data_folder, extension, tag=None, checksum=None):
     # type: (str, str|Path, str, str|None, str | None) -> Path
     """
@@ -46,12 +47,66 @@ def result_path(algo_label, data_folder, extension, tag=None, checksum=None):
     if not data_folder.is_absolute():
         data_folder = ts.opts.root_folder / data_folder
     dataset_label = data_folder.name
-    checksum = ts.check_dir_fast(data_folder, expected=checksum)
+    actual = folder_checksum(data_folder)
+    if checksum and checksum != actual:
+        raise ts.IntegrityError(data_folder, checksum, actual)
+    checksum = actual
     stem = f"{algo_label}-{dataset_label}-{checksum}"
     suffix = f"-{tag}.{extension}" if tag else f".{extension}"
     return ts.opts.root_folder / f"{stem}{suffix}"
 
 
+def folder_checksum(data_folder):
+    # type: (Path) -> str
+    """
+    Compute the fast checksum of an installed data folder.
+
+    Checksums are cached per process and keyed on the modification times of all directories in the
+    data folder, so result paths for different algorithms, tags and extensions only walk the folder
+    once. The key catches most added, removed or renamed files, but not files rewritten in place
+    and not changes within the mtime resolution of coarse filesystems. Code that modifies data
+    folders must therefore call `clear_folder_checksums` afterwards.
+
+    :param data_folder: Absolute path to the data folder.
+    :return: Hex encoded fast checksum of the data folder.
+    """
+    return _folder_checksum(data_folder, tree_mtime(data_folder))
+
+
+@cache
+def _folder_checksum(data_folder, mtime_ns):
+    # type: (Path, int) -> str
+    """Compute the fast checksum of a data folder once per folder state (see `folder_checksum`)."""
+    return ts.check_dir_fast(data_folder)
+
+
+def clear_folder_checksums():
+    # type: () -> None
+    """Drop all cached data folder checksums (call after installing or modifying data folders)."""
+    _folder_checksum.cache_clear()
+
+
+def tree_mtime(path):
+    # type: (Path) -> int
+    """
+    Return the latest modification time (in ns) of a folder and all of its sub-directories.
+
+    Only directories are stat'ed, which is much cheaper than collecting metadata of all files.
+
+    :param path: Path to the folder.
+    :return: Latest directory modification timestamp in nanoseconds.
+    """
+    latest = os.stat(path).st_mtime_ns
+    stack = [os.fspath(path)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    latest = max(latest, entry.stat(follow_symlinks=False).st_mtime_ns)
+                    stack.append(entry.path)
+    return latest
+
+
 @contextmanager
 def silence():
     """Context manager for silenceing console output."""
@@ -80,6 +135,7 @@ def get_function(algoritm):
     return load_function(algoritm.function)
 
 
+@cache
 def load_function(path: str):
     module_path, function_name = path.split(":")
     module = importlib.import_module(module_path)
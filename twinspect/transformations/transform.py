@@ -54,3 +54,4 @@ def transform_data_folder(data_folder, ts_labels):
                 log.error(f"Failed transformation")
             else:
                 log.trace(f"-> {result.name}")
+    ts.clear_folder_checksums()